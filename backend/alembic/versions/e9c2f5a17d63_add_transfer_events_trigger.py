@@ -0,0 +1,41 @@
+"""add transfer events trigger
+
+Revision ID: e9c2f5a17d63
+Revises: d41a7c3e9b05
+Create Date: 2026-10-18 18:05:32.660194
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'e9c2f5a17d63'
+down_revision: Union[str, None] = 'd41a7c3e9b05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE OR REPLACE FUNCTION transfers_notify_changed() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('transfer_events', NEW.id::text);
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    # Heartbeats don't change visible state, so they are not notified
+    op.execute("""
+        CREATE TRIGGER transfers_notify_changed
+        AFTER UPDATE ON transfers
+        FOR EACH ROW
+        WHEN ((OLD.status, OLD.processed, OLD.total, OLD.result, OLD.error)
+              IS DISTINCT FROM (NEW.status, NEW.processed, NEW.total, NEW.result, NEW.error))
+        EXECUTE FUNCTION transfers_notify_changed()
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS transfers_notify_changed ON transfers")
+    op.execute("DROP FUNCTION IF EXISTS transfers_notify_changed()")
@@ -0,0 +1,76 @@
+"""
+Compare HTTP client opening a session for each request with client using the shared session.
+By default requests go to a local server, pass URL of a real API to include TLS handshakes:
+python -m scripts.benchmark_http_session [--url https://api.spotify.com/v1] [--requests 2000] [--concurrency 20]
+Run from backend directory
+"""
+import argparse
+import asyncio
+import os
+import time
+
+_ENV = {"ENVIRONMENT": "test", "DOMAIN": "localhost", "DB_TYPE": "ASYNC_POSTGRESQL", "DB_NAME": "x", "DB_HOST": "x"}
+for name, value in _ENV.items():
+    os.environ.setdefault(name, value)
+
+from aiohttp import web  # noqa: E402
+
+from src.integration.domain.exceptions import ExternalApiError  # noqa: E402
+from src.integration.infrastructure.http.async_client import HTTPAsyncClient  # noqa: E402
+from src.integration.infrastructure.http.session import close_http_session, open_http_session  # noqa: E402
+
+LOCAL_HOST = "127.0.0.1"
+LOCAL_PORT = 8765
+
+
+async def start_local_server() -> web.AppRunner:
+    async def handle(_request: web.Request) -> web.Response:
+        return web.json_response({"ok": True})
+
+    app = web.Application()
+    app.router.add_get("/", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, LOCAL_HOST, LOCAL_PORT).start()
+    return runner
+
+
+async def measure(client: HTTPAsyncClient, url: str, requests: int, concurrency: int) -> float:
+    """Requests per second"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def request() -> None:
+        async with semaphore:
+            try:
+                await client.get(url)
+            except ExternalApiError:
+                # Error status of real API without token is fine, only round trip is measured
+                pass
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(request() for _ in range(requests)))
+    return requests / (time.perf_counter() - started_at)
+
+
+async def main(url: str | None, requests: int, concurrency: int) -> None:
+    runner = await start_local_server() if url is None else None
+    url = url or f"http://{LOCAL_HOST}:{LOCAL_PORT}/"
+    try:
+        per_request = await measure(HTTPAsyncClient(), url, requests, concurrency)
+        shared = await measure(HTTPAsyncClient(await open_http_session()), url, requests, concurrency)
+    finally:
+        await close_http_session()
+        if runner is not None:
+            await runner.cleanup()
+    print(f"{requests} requests to {url}, {concurrency} concurrent")
+    print(f"session per request: {per_request:.0f} req/s")
+    print(f"shared session: {shared:.0f} req/s ({shared / per_request:.1f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.url, args.requests, args.concurrency))
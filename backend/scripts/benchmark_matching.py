@@ -0,0 +1,45 @@
+"""
+Time candidate ranking on matching corpus of tests.
+Run from backend directory: python -m scripts.benchmark_matching
+"""
+import json
+import os
+import time
+from pathlib import Path
+
+for name, value in {"DOMAIN": "localhost", "DB_TYPE": "ASYNC_POSTGRESQL", "DB_NAME": "x", "DB_HOST": "x"}.items():
+    os.environ.setdefault(name, value)
+
+from src.integration.domain.entities import MusicSource, Track  # noqa: E402
+from src.integration.domain.matching import TrackFeatures, rank_candidates  # noqa: E402
+
+CORPUS_PATH = Path(__file__).parent.parent / "tests" / "data" / "matching_corpus.json"
+ROUNDS = 2000
+
+
+def main() -> None:
+    cases = []
+    for case in json.loads(CORPUS_PATH.read_text()):
+        query = case["query"]
+        candidates = [
+            Track(source_id=str(i), source=MusicSource.YOUTUBE, name=c["name"], artist_name=c["artist"],
+                  duration_ms=c.get("duration_ms"))
+            for i, c in enumerate(case["candidates"])
+        ]
+        cases.append((query, candidates))
+
+    started_at = time.perf_counter()
+    for _ in range(ROUNDS):
+        for query, candidates in cases:
+            features = TrackFeatures.from_values(query["name"], query["artist"], query.get("duration_ms"))
+            rank_candidates(features, candidates)
+    elapsed = time.perf_counter() - started_at
+
+    searches = ROUNDS * len(cases)
+    candidates_count = ROUNDS * sum(len(candidates) for _, candidates in cases)
+    print(f"{searches} searches, {candidates_count} candidates in {elapsed:.3f}s: "
+          f"{elapsed / searches * 1e6:.1f}us per search, {elapsed / candidates_count * 1e6:.1f}us per candidate")
+
+
+if __name__ == "__main__":
+    main()
@@ -26,6 +26,62 @@ class Settings(BaseSettings):
     YOUTUBE_CLIENT_ID: str = ""
     YOUTUBE_CLIENT_SECRET: str = ""
 
+    HTTP_CONNECTIONS_LIMIT: int = 100
+    HTTP_CONNECTIONS_LIMIT_PER_HOST: int = 30
+    HTTP_KEEPALIVE_TIMEOUT: float = 30.0
+    HTTP_DNS_CACHE_TTL: int = 300
+    HTTP_REQUEST_TIMEOUT: float = 30.0
+    # Requests per second allowed for each provider host
+    HTTP_RATE_LIMITS: dict[str, float] = {"api.spotify.com": 20.0, "www.googleapis.com": 20.0}
+    HTTP_RATE_LIMIT_DEFAULT: float = 10.0
+    HTTP_RETRY_ATTEMPTS: int = 5
+    HTTP_RETRY_BACKOFF_BASE: float = 0.5
+    HTTP_RETRY_BACKOFF_MAX: float = 30.0
+
+    # Token is refreshed, if it expires earlier than in margin seconds
+    TOKEN_REFRESH_MARGIN: int = 60
+    # How long token without known expiration is considered valid after check in source
+    TOKEN_VALIDATION_CACHE_TTL: int = 300
+    # How long loaded user token is reused without reading database
+    TOKEN_CACHE_TTL: int = 60
+
+    # Transfers run in parallel by one worker process in lane of small (album, playlist) and large (favorite) jobs
+    TRANSFER_SMALL_LANE_CONCURRENCY: int = 3
+    TRANSFER_LARGE_LANE_CONCURRENCY: int = 1
+    # Transfers run in parallel by all workers for each destination source
+    TRANSFER_DESTINATION_CONCURRENCY: dict[str, int] = {"spotify": 20, "youtube": 2}
+    TRANSFER_WORKER_POLL_INTERVAL: float = 1.0
+    TRANSFER_HEARTBEAT_INTERVAL: float = 10.0
+    # Started transfer without heartbeat for this time is returned to queue
+    TRANSFER_STALE_TIMEOUT: float = 60.0
+    TRANSFER_MAX_ATTEMPTS: int = 3
+
+    TRANSFER_EVENTS_KEEPALIVE_INTERVAL: float = 15.0
+    TRANSFER_LONG_POLL_MAX_WAIT: float = 60.0
+
+    # Chunks of tracks buffered between fetch, search and add stages of transfer
+    TRANSFER_PIPELINE_QUEUE_SIZE: int = 2
+
+    SPOTIFY_SEARCH_CONCURRENCY: int = 8
+    SPOTIFY_PAGE_CONCURRENCY: int = 5
+    YOUTUBE_SEARCH_CONCURRENCY: int = 4
+    YOUTUBE_DAILY_QUOTA: int = 10000
+    # Units reserved from shared daily quota at once and spent by process locally
+    YOUTUBE_QUOTA_BATCH: int = 500
+
+    # Search results ranked by similarity to source track. Youtube search quota cost doesn't depend on it
+    TRACK_SEARCH_CANDIDATES: int = 10
+    # Best candidate with lower similarity score is considered not found
+    TRACK_MATCH_MIN_SCORE: float = 0.6
+
+    # Each process saves its metrics to database with interval, metrics of processes silent for ttl are dropped
+    METRICS_EXPORT_INTERVAL: float = 30.0
+    METRICS_PROCESS_TTL: int = 24 * 60 * 60
+
+    TRACK_MATCH_CACHE_SIZE: int = 50000
+    TRACK_MATCH_CACHE_TTL: int = 30 * 24 * 60 * 60
+    TRACK_MATCH_CACHE_NEGATIVE_TTL: int = 24 * 60 * 60
+
     @staticmethod
     def _build_dsn(scheme: str, values: dict) -> str:
         return str(
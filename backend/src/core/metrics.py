@@ -0,0 +1,37 @@
+from collections import defaultdict
+
+
+class Metrics:
+    """In-process counters and gauges. Snapshots of all processes are aggregated on GET /api/metrics"""
+
+    def __init__(self) -> None:
+        self._counters: dict[str, float] = defaultdict(float)
+        self._gauges: dict[str, float] = {}
+
+    @staticmethod
+    def _key(name: str, labels: dict[str, str]) -> str:
+        if not labels:
+            return name
+        return name + "{" + ",".join(f'{k}="{v}"' for k, v in sorted(labels.items())) + "}"
+
+    def inc(self, name: str, value: float = 1, **labels: str) -> None:
+        self._counters[self._key(name, labels)] += value
+
+    def set(self, name: str, value: float, **labels: str) -> None:
+        self._gauges[self._key(name, labels)] = value
+
+    def get(self, name: str, **labels: str) -> float:
+        key = self._key(name, labels)
+        return self._gauges.get(key, self._counters.get(key, 0))
+
+    def counters(self) -> dict[str, float]:
+        return dict(self._counters)
+
+    def gauges(self) -> dict[str, float]:
+        return dict(self._gauges)
+
+    def snapshot(self) -> dict[str, float]:
+        return dict(self._counters) | self._gauges
+
+
+metrics = Metrics()
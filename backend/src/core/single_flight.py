@@ -0,0 +1,21 @@
+import asyncio
+from typing import Awaitable, Callable, Hashable
+
+
+class SingleFlight[T]:
+    """Coalesce concurrent calls with the same key into one execution, all callers receive its result"""
+
+    def __init__(self) -> None:
+        self._in_flight: dict[Hashable, asyncio.Task[T]] = {}
+
+    async def run(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.create_task(func())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        # Cancellation of one caller must not cancel the call for others
+        return await asyncio.shield(task)
+
+    def __len__(self) -> int:
+        return len(self._in_flight)
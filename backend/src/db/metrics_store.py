@@ -0,0 +1,75 @@
+import asyncio
+import datetime as dt
+import json
+import os
+import socket
+
+from loguru import logger
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.core.config import settings
+from src.core.metrics import Metrics, metrics
+from src.db.base import Base, BaseMixin
+from src.db.engine import async_session_maker
+
+
+class ProcessMetricsDB(BaseMixin, Base):
+    __tablename__ = "process_metrics"
+
+    process_id: Mapped[str] = mapped_column(unique=True)
+    counters: Mapped[str]
+    gauges: Mapped[str]
+
+
+class PGMetricsStore:
+    """
+    Snapshots of metrics of api and worker processes, so they can be read from any process.
+    Counters of processes are summed, gauges are taken from the most recently saved snapshot
+    """
+
+    def __init__(self, ttl: int, source: Metrics = metrics, session_factory=async_session_maker) -> None:
+        self.ttl = dt.timedelta(seconds=ttl)
+        self.source = source
+        self.session_factory = session_factory
+
+    @staticmethod
+    def _process_id() -> str:
+        # Evaluated on each save, forked processes must not share id
+        return f"{socket.gethostname()}:{os.getpid()}"
+
+    async def save(self) -> None:
+        values = {"counters": json.dumps(self.source.counters()), "gauges": json.dumps(self.source.gauges())}
+        query = insert(ProcessMetricsDB).values(process_id=self._process_id(), **values)
+        query = query.on_conflict_do_update(
+            index_elements=[ProcessMetricsDB.process_id], set_=values | {"updated_at": func.now()}
+        )
+        async with self.session_factory() as session:
+            await session.execute(query)
+            await session.commit()
+
+    async def load(self) -> dict[str, float]:
+        saved_at = func.coalesce(ProcessMetricsDB.updated_at, ProcessMetricsDB.created_at)
+        query = select(ProcessMetricsDB).where(saved_at > func.now() - self.ttl).order_by(saved_at)
+        async with self.session_factory() as session:
+            models = await session.scalars(query)
+            counters: dict[str, float] = {}
+            gauges: dict[str, float] = {}
+            for model in models:
+                for key, value in json.loads(model.counters).items():
+                    counters[key] = counters.get(key, 0) + value
+                gauges |= json.loads(model.gauges)
+        return counters | gauges
+
+    async def run(self, interval: float) -> None:
+        """Save snapshot periodically until cancelled"""
+        while True:
+            try:
+                await self.save()
+            except Exception as e:
+                logger.warning(f"Failed to save metrics: {e}")
+            await asyncio.sleep(interval)
+
+
+metrics_store = PGMetricsStore(settings.METRICS_PROCESS_TTL)
@@ -1,13 +1,28 @@
 from src.core.config import settings
 from src.integration.infrastructure.external_api.spotify.transfer_client import SpotifyTransferClient
 from src.integration.infrastructure.external_api.youtube_music.transfer_client import YoutubeMusicTransferClient
+from src.integration.application.interfaces.http_client import IHTTPClient
 from src.integration.infrastructure.http.async_client import HTTPAsyncClient
+from src.integration.infrastructure.http.rate_limited_client import HTTPRateLimiter, RateLimitedHTTPClient
+from src.integration.infrastructure.http.session import get_http_session
 from src.transfer.application.interfaces.transfer_client import ITransferClient
 
+rate_limiter = HTTPRateLimiter(settings.HTTP_RATE_LIMITS, settings.HTTP_RATE_LIMIT_DEFAULT)
+
+
+def get_http_client() -> IHTTPClient:
+    return RateLimitedHTTPClient(
+        HTTPAsyncClient(get_http_session()),
+        rate_limiter,
+        max_retries=settings.HTTP_RETRY_ATTEMPTS,
+        backoff_base=settings.HTTP_RETRY_BACKOFF_BASE,
+        backoff_max=settings.HTTP_RETRY_BACKOFF_MAX,
+    )
+
 
 def get_spotify_client() -> ITransferClient:
-    return SpotifyTransferClient(HTTPAsyncClient(), settings.SPOTIFY_CLIENT_ID, settings.SPOTIFY_CLIENT_SECRET)
+    return SpotifyTransferClient(get_http_client(), settings.SPOTIFY_CLIENT_ID, settings.SPOTIFY_CLIENT_SECRET)
 
 
 def get_youtube_client() -> ITransferClient:
-    return YoutubeMusicTransferClient(HTTPAsyncClient())
+    return YoutubeMusicTransferClient(get_http_client())
@@ -2,6 +2,7 @@ from typing import Generic
 
 from fastapi import HTTPException
 
+from src.integration.domain.entities import PlaylistTracksAddResult
 from src.integration.domain.exceptions import ExternalApiEmptyResponseError, ExternalApiError, \
     ExternalApiInvalidResponseError
 from src.transfer.application.interfaces.transfer_client import ITransferClient, TToken
@@ -11,9 +12,9 @@ class AddTracksToPlaylist(Generic[TToken]):
     def __init__(self, transfer_client: ITransferClient) -> None:
         self.transfer_client = transfer_client
 
-    async def execute(self, token: TToken, playlist_id: str, *tracks_ids: list[str]) -> None:
+    async def execute(self, token: TToken, playlist_id: str, *tracks_ids: str) -> list[PlaylistTracksAddResult]:
         try:
-            await self.transfer_client.add_tracks_to_playlist(token, playlist_id, *tracks_ids)
+            return await self.transfer_client.add_tracks_to_playlist(token, playlist_id, *tracks_ids)
         except ExternalApiEmptyResponseError as e:
             raise HTTPException(404, detail=e.detail or "Not found")
         except ExternalApiInvalidResponseError as e:
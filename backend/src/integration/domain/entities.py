@@ -32,3 +32,34 @@ class Track(BaseModel):
     name: str
     artist_name: str
     image_url: str | None = None
+    duration_ms: int | None = None
+    isrc: str | None = None
+
+
+class TracksPage(BaseModel):
+    tracks: list[Track]
+    total: int | None = None
+    """Count of all tracks of source collection. None if source doesn't report it"""
+
+
+class PlaylistTracksAddResult(BaseModel):
+    offset: int
+    tracks_count: int
+    snapshot_id: str | None = None
+
+
+class MatchStatus(str, Enum):
+    matched = "matched"
+    not_found = "not_found"
+    failed = "failed"
+
+
+class MatchResult(BaseModel):
+    """Result of search of source track in destination"""
+    index: int
+    """Position of track in searched batch"""
+    status: MatchStatus
+    destination_id: str | None = None
+    latency_ms: int | None = None
+    """None if match was taken from cache"""
+    error: str | None = None
@@ -13,3 +13,21 @@ class ExternalApiInvalidResponseError(ExternalApiError):
 
 class ExternalApiUnauthorizedError(ExternalApiError):
     pass
+
+
+class ExternalApiNotFoundError(ExternalApiError):
+    pass
+
+
+class ExternalApiTooManyRequestsError(ExternalApiError):
+    def __init__(self, detail: str | None = None, retry_after: float | None = None) -> None:
+        super().__init__(detail)
+        self.retry_after = retry_after
+
+
+class ExternalApiUnavailableError(ExternalApiError):
+    pass
+
+
+class ExternalApiQuotaExceededError(ExternalApiError):
+    pass
@@ -0,0 +1,124 @@
+import re
+import unicodedata
+from dataclasses import dataclass
+from functools import lru_cache
+
+from src.integration.domain.entities import Track
+
+# Parts of title, which describe release and not recording: "(feat. X)", "[Official Video]", "- 2011 Remaster".
+# Applied in order, remaster suffix is looked for after bracketed parts are removed
+_TITLE_NOISE = (
+    re.compile(
+        r"[(\[][^)\]]*\b(feat|ft|featuring|with|remaster|remastered|official|video|audio|lyrics?|visualizer|hd|hq|"
+        r"explicit)\b[^)\]]*[)\]]"
+    ),
+    re.compile(r"\s-\s[^-()\[\]]*\bremaster(ed)?\b[^-()\[\]]*$"),
+    re.compile(r"\b(feat|ft|featuring)\b.*$"),
+)
+# Channel suffixes of youtube artists: "Artist - Topic", "ArtistVEVO"
+_ARTIST_NOISE = (re.compile(r"\s-\stopic$|vevo$|\bofficial\b"),)
+_NON_WORD = re.compile(r"[\W_]+")
+
+# Words, which mark different recording of the same song. Mismatch of them is penalized
+VERSION_MARKERS = frozenset({
+    "live", "remix", "mix", "acoustic", "instrumental", "karaoke", "cover", "demo", "edit", "version", "slowed",
+    "sped", "reverb", "nightcore",
+})
+
+TITLE_WEIGHT = 0.6
+ARTIST_WEIGHT = 0.3
+DURATION_WEIGHT = 0.1
+# Difference of durations, at which duration score drops to 0
+DURATION_TOLERANCE_MS = 15000
+VERSION_MISMATCH_FACTOR = 0.6
+
+
+@lru_cache(maxsize=65536)
+def _normalize(value: str, noise: tuple[re.Pattern, ...]) -> str:
+    value = unicodedata.normalize("NFKD", value.casefold())
+    value = "".join(char for char in value if not unicodedata.combining(char))
+    for pattern in noise:
+        value = pattern.sub(" ", value)
+    return _NON_WORD.sub(" ", value).strip()
+
+
+def normalize_title(title: str) -> str:
+    return _normalize(title, _TITLE_NOISE)
+
+
+def normalize_artist(artist: str) -> str:
+    return _normalize(artist, _ARTIST_NOISE)
+
+
+@dataclass(frozen=True, slots=True)
+class TrackFeatures:
+    """Normalized track data, computed once and compared with many candidates"""
+    title_tokens: frozenset[str]
+    artist_tokens: frozenset[str]
+    # Artist without spaces to match channel names like "daftpunk"
+    artist_compact: str
+    duration_ms: int | None = None
+
+    @classmethod
+    def from_values(cls, title: str, artist: str, duration_ms: int | None = None) -> "TrackFeatures":
+        return _track_features(title, artist, duration_ms)
+
+    @classmethod
+    def from_track(cls, track: Track) -> "TrackFeatures":
+        return _track_features(track.name, track.artist_name, track.duration_ms)
+
+
+@lru_cache(maxsize=65536)
+def _track_features(title: str, artist: str, duration_ms: int | None) -> TrackFeatures:
+    # The same candidates come back for repeated and similar searches, so their features are reused
+    artist = normalize_artist(artist)
+    return TrackFeatures(
+        title_tokens=frozenset(normalize_title(title).split()),
+        artist_tokens=frozenset(artist.split()),
+        artist_compact=artist.replace(" ", ""),
+        duration_ms=duration_ms,
+    )
+
+
+def score_candidate(query: TrackFeatures, candidate: TrackFeatures) -> float:
+    """Similarity of candidate to query from 0 to 1 by title, artist and duration"""
+    if not query.title_tokens or not candidate.title_tokens:
+        return 0.0
+    # Video titles often contain artist, so it is matched against whole candidate
+    candidate_tokens = candidate.title_tokens | candidate.artist_tokens
+    recall = len(query.title_tokens & candidate_tokens) / len(query.title_tokens)
+    precision = len(candidate.title_tokens & (query.title_tokens | query.artist_tokens)) / len(candidate.title_tokens)
+    title_score = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+
+    if not query.artist_tokens or (query.artist_compact and query.artist_compact in candidate.artist_compact):
+        artist_score = 1.0
+    else:
+        artist_score = len(query.artist_tokens & candidate_tokens) / len(query.artist_tokens)
+        # Songs with the same title by other artists are common, title alone is never enough
+        if not artist_score:
+            return 0.0
+
+    score = TITLE_WEIGHT * title_score + ARTIST_WEIGHT * artist_score
+    weights = TITLE_WEIGHT + ARTIST_WEIGHT
+    if query.duration_ms is not None and candidate.duration_ms is not None:
+        difference = abs(query.duration_ms - candidate.duration_ms)
+        score += DURATION_WEIGHT * max(0.0, 1 - difference / DURATION_TOLERANCE_MS)
+        weights += DURATION_WEIGHT
+    score /= weights
+
+    mismatched_markers = (query.title_tokens ^ candidate.title_tokens) & VERSION_MARKERS
+    return score * VERSION_MISMATCH_FACTOR ** len(mismatched_markers)
+
+
+def rank_candidates(query: TrackFeatures, candidates: list[Track]) -> list[tuple[Track, float]]:
+    """Candidates with scores from best to worst. Order of source is kept for equal scores"""
+    features = [TrackFeatures.from_track(candidate) for candidate in candidates]
+    scores = [score_candidate(query, candidate_features) for candidate_features in features]
+    return sorted(zip(candidates, scores, strict=True), key=lambda item: item[1], reverse=True)
+
+
+def best_match(query: TrackFeatures, candidates: list[Track], min_score: float) -> Track | None:
+    ranked = rank_candidates(query, candidates)
+    if not ranked or ranked[0][1] < min_score:
+        return None
+    return ranked[0][0]
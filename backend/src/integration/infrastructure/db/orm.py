@@ -0,0 +1,15 @@
+import datetime as dt
+
+from sqlalchemy import UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.db.base import Base, BaseMixin
+
+
+class ApiQuotaUsageDB(BaseMixin, Base):
+    __tablename__ = "api_quota_usage"
+    __table_args__ = (UniqueConstraint("source", "day"),)
+
+    source: Mapped[str]
+    day: Mapped[dt.date]
+    used: Mapped[int] = mapped_column(server_default="0", default=0)
@@ -9,6 +9,7 @@ class SpotifyAuthData(BaseModel):
 class SpotifyToken(BaseModel):
     access_token: str
     refresh_token: str
+    expires_at: float | None = Field(description="Unix timestamp. Unknown for tokens passed by client", default=None)
 
 
 class SpotifyResponse(BaseModel):
@@ -46,10 +47,15 @@ class SpotifyTrack(BaseModel):
             name: str
             uri: str
 
+        class SpotifyTrackExternalIds(BaseModel):
+            isrc: str | None = None
+
         name: str
         id: str
         uri: str
         artists: list[SpotifyTrackArtist]
+        duration_ms: int | None = None
+        external_ids: SpotifyTrackExternalIds | None = None
 
     track: SpotifyTrackData
 
@@ -1,15 +1,24 @@
+import asyncio
 import base64
+import time
+from collections import deque
+from typing import AsyncIterator
 from urllib.parse import urlencode
 
 from loguru import logger
 from pydantic import ValidationError
 
+from src.core.cache import TTLCache
+from src.core.config import settings
+from src.core.metrics import metrics
 from src.integration.application.interfaces.http_client import IHTTPClient
-from src.integration.domain.entities import Album, Track, Playlist, MusicSource
+from src.integration.domain.entities import Album, Track, Playlist, MusicSource, PlaylistTracksAddResult, TracksPage
+from src.integration.domain.matching import TrackFeatures, best_match
 from src.integration.domain.exceptions import (
     ExternalApiUnauthorizedError,
     ExternalApiEmptyResponseError,
     ExternalApiInvalidResponseError,
+    ExternalApiNotFoundError,
 )
 from src.integration.infrastructure.external_api.spotify.entities import (
     SpotifyUser,
@@ -32,6 +41,16 @@ class SpotifyTransferClient[TAuthData: SpotifyAuthData, TToken: SpotifyToken](
     SOURCE: str = MusicSource.SPOTIFY.value
     SCOPE: str = "playlist-read-private playlist-read-public playlist-modify-private playlist-modify-public user-read-private user-library-modify user-library-read"
     STATE: str = "c459138cn57"
+    SEARCH_CONCURRENCY: int = settings.SPOTIFY_SEARCH_CONCURRENCY
+    SEARCH_CANDIDATES: int = settings.TRACK_SEARCH_CANDIDATES
+    ALBUMS_CHUNK_SIZE: int = 20
+    PAGE_CONCURRENCY: int = settings.SPOTIFY_PAGE_CONCURRENCY
+    PAGE_SIZE: int = 50
+    # Max uris accepted by POST /v1/playlists/{id}/tracks
+    ADD_TRACKS_CHUNK_SIZE: int = 100
+
+    # Shared by all instances, access token -> True
+    _validated_tokens: TTLCache[str, bool] = TTLCache(10000, settings.TOKEN_VALIDATION_CACHE_TTL)
 
     def __init__(
             self, http_client: IHTTPClient[dict], client_id: str, client_secret: str
@@ -61,14 +80,90 @@ class SpotifyTransferClient[TAuthData: SpotifyAuthData, TToken: SpotifyToken](
         except ValidationError as e:
             raise ExternalApiInvalidResponseError(str(e))
 
-    async def get_user_albums(self, token: SpotifyToken) -> list[Album]:
-        response = await self.http_client.get(self.API_URL + "/v1/me/albums", params={"limit": 50},
-                                              headers={"Authorization": "Bearer " + token.access_token})
+    async def _get_page(
+            self, token: SpotifyToken, path: str, offset: int, params: dict | None = None
+    ) -> SpotifyResponse:
+        response = await self.http_client.get(
+            self.API_URL + path,
+            params=(params or {}) | {"limit": self.PAGE_SIZE, "offset": offset},
+            headers=self._make_client_auth_header(token),
+        )
         try:
-            result = SpotifyResponse.model_validate(response)
-            if not result.items:
+            return SpotifyResponse.model_validate(response)
+        except ValidationError as e:
+            raise ExternalApiInvalidResponseError(str(e)) from e
+
+    async def _get_all_items(self, token: SpotifyToken, path: str, params: dict | None = None) -> list[dict]:
+        """Fetch first page to know total, then the rest of pages concurrently. Items order is kept"""
+        first_page = await self._get_page(token, path, 0, params)
+        semaphore = asyncio.Semaphore(self.PAGE_CONCURRENCY)
+
+        async def get_page(offset: int) -> SpotifyResponse:
+            async with semaphore:
+                return await self._get_page(token, path, offset, params)
+
+        pages = await asyncio.gather(
+            *(get_page(offset) for offset in range(self.PAGE_SIZE, first_page.total, self.PAGE_SIZE))
+        )
+        return first_page.items + [item for page in pages for item in page.items]
+
+    async def _iter_pages(
+            self, token: SpotifyToken, path: str, params: dict | None = None
+    ) -> AsyncIterator[SpotifyResponse]:
+        """
+        Yield pages in order. As in _get_all_items the rest of pages are requested concurrently
+        after the first one, but only PAGE_CONCURRENCY pages are requested ahead of caller
+        """
+        first_page = await self._get_page(token, path, 0, params)
+        offsets = iter(range(self.PAGE_SIZE, first_page.total, self.PAGE_SIZE))
+        next_pages: deque[asyncio.Task[SpotifyResponse]] = deque()
+
+        def request_next_pages() -> None:
+            while len(next_pages) < self.PAGE_CONCURRENCY and (offset := next(offsets, None)) is not None:
+                next_pages.append(asyncio.create_task(self._get_page(token, path, offset, params)))
+
+        try:
+            request_next_pages()
+            yield first_page
+            while next_pages:
+                page = await next_pages.popleft()
+                request_next_pages()
+                yield page
+        finally:
+            for next_page in next_pages:
+                next_page.cancel()
+
+    async def _iter_tracks(self, token: SpotifyToken, path: str) -> AsyncIterator[TracksPage]:
+        is_first_page = True
+        # Total of response counts episodes and local files too, they are subtracted as soon as they are seen
+        skipped_count = 0
+        async for page in self._iter_pages(token, path):
+            if is_first_page and not page.items:
                 raise ExternalApiEmptyResponseError()
-            albums = [SpotifyAlbum.model_validate(i) for i in result.items]
+            is_first_page = False
+            try:
+                tracks = [SpotifyTrack.model_validate(i) for i in page.items if self._is_track_item(i)]
+            except ValidationError as e:
+                raise ExternalApiInvalidResponseError(str(e)) from e
+            skipped_count += len(page.items) - len(tracks)
+            yield TracksPage(
+                tracks=[self._track_to_domain(track) for track in tracks], total=page.total - skipped_count
+            )
+
+    async def iter_user_favorites_tracks(self, token: SpotifyToken) -> AsyncIterator[TracksPage]:
+        async for page in self._iter_tracks(token, "/v1/me/tracks"):
+            yield page
+
+    async def iter_user_playlist_tracks(self, token: SpotifyToken, playlist_id: str) -> AsyncIterator[TracksPage]:
+        async for page in self._iter_tracks(token, f"/v1/playlists/{playlist_id}/tracks"):
+            yield page
+
+    async def get_user_albums(self, token: SpotifyToken) -> list[Album]:
+        items = await self._get_all_items(token, "/v1/me/albums")
+        if not items:
+            raise ExternalApiEmptyResponseError()
+        try:
+            albums = [SpotifyAlbum.model_validate(i) for i in items]
         except ValidationError as e:
             raise ExternalApiInvalidResponseError(str(e))
         return [
@@ -76,37 +171,56 @@ class SpotifyTransferClient[TAuthData: SpotifyAuthData, TToken: SpotifyToken](
             for album in albums
         ]
 
-    async def get_user_favorites_tracks(self, token: SpotifyToken, total=None, offset=0, count=50) -> list[Track]:
-        if total is not None and offset + count >= total:
-            return []
-
-        response = await self.http_client.get(self.API_URL + "/v1/me/tracks",
-                                              headers={"Authorization": "Bearer " + token.access_token},
-                                              params={"limit": count, "offset": offset})
+    async def get_album(self, token: SpotifyToken, album_id: str) -> Album:
         try:
-            result = SpotifyResponse.model_validate(response)
-            if not result.items:
-                raise ExternalApiEmptyResponseError()
-            tracks = [SpotifyTrack.model_validate(i) for i in result.items]
+            response = await self.http_client.get(
+                self.API_URL + f"/v1/albums/{album_id}",
+                headers=self._make_client_auth_header(token),
+            )
+        except ExternalApiNotFoundError as e:
+            raise ExternalApiEmptyResponseError(e.detail) from e
+        if not response:
+            raise ExternalApiEmptyResponseError()
+        try:
+            album = SpotifyAlbum.model_validate({"album": response})
         except ValidationError as e:
             raise ExternalApiInvalidResponseError(str(e)) from e
-        tracks = [self._track_to_domain(track) for track in tracks]
+        return self._album_to_domain(album)
 
-        tracks += await self.get_user_favorites_tracks(token, response.get("total", 0), offset + len(tracks))
+    async def get_albums(self, token: SpotifyToken, *album_ids: str) -> list[Album]:
+        chunks = [album_ids[i:i + self.ALBUMS_CHUNK_SIZE] for i in range(0, len(album_ids), self.ALBUMS_CHUNK_SIZE)]
+        responses = await asyncio.gather(*(
+            self.http_client.get(
+                self.API_URL + "/v1/albums",
+                params={"ids": ",".join(chunk)},
+                headers=self._make_client_auth_header(token),
+            )
+            for chunk in chunks
+        ))
+        try:
+            # Album is null, if id is not found
+            albums = [SpotifyAlbum.model_validate({"album": i}) for r in responses for i in r.get("albums", []) if i]
+        except ValidationError as e:
+            raise ExternalApiInvalidResponseError(str(e)) from e
+        return [self._album_to_domain(album) for album in albums]
 
-        return tracks
+    async def get_user_favorites_tracks(self, token: SpotifyToken) -> list[Track]:
+        items = await self._get_all_items(token, "/v1/me/tracks")
+        if not items:
+            raise ExternalApiEmptyResponseError()
+        try:
+            tracks = [SpotifyTrack.model_validate(i) for i in items if self._is_track_item(i)]
+        except ValidationError as e:
+            raise ExternalApiInvalidResponseError(str(e)) from e
+        return [self._track_to_domain(track) for track in tracks]
 
     async def get_user_playlists(self, token: SpotifyToken) -> list[Playlist]:
-        response = await self.http_client.get(
-            self.API_URL + "/v1/me/playlists",
-            params={"limit": 50},
-            headers={"Authorization": "Bearer " + token.access_token},
-        )
+        items = await self._get_all_items(token, "/v1/me/playlists")
+        if not items:
+            raise ExternalApiEmptyResponseError()
         try:
-            result = SpotifyResponse.model_validate(response)
-            if not result.items:
-                raise ExternalApiEmptyResponseError()
-            playlists = [SpotifyPlaylist.model_validate(i) for i in result.items]
+            # Playlist item may be null, if it was deleted
+            playlists = [SpotifyPlaylist.model_validate(i) for i in items if i]
         except ValidationError as e:
             raise ExternalApiInvalidResponseError(str(e))
         return [self._playlist_to_domain(playlist) for playlist in playlists]
@@ -114,20 +228,23 @@ class SpotifyTransferClient[TAuthData: SpotifyAuthData, TToken: SpotifyToken](
     async def get_user_playlist_tracks(
             self, token: SpotifyToken, playlist_id: str
     ) -> list[Track]:
-        response = await self.http_client.get(
-            self.API_URL + f"/v1/playlists/{playlist_id}/tracks",
-            params={"limit": 50},
-            headers={"Authorization": "Bearer " + token.access_token},
-        )
+        items = await self._get_all_items(token, f"/v1/playlists/{playlist_id}/tracks")
+        if not items:
+            raise ExternalApiEmptyResponseError()
         try:
-            result = SpotifyResponse.model_validate(response)
-            if not result.items:
-                raise ExternalApiEmptyResponseError()
-            tracks = [SpotifyTrack.model_validate(i) for i in result.items]
+            tracks = [SpotifyTrack.model_validate(i) for i in items if self._is_track_item(i)]
         except ValidationError as e:
             raise ExternalApiInvalidResponseError(str(e))
         return [self._track_to_domain(track) for track in tracks]
 
+    async def get_playlist_snapshot_id(self, token: SpotifyToken, playlist_id: str) -> str | None:
+        response = await self.http_client.get(
+            self.API_URL + f"/v1/playlists/{playlist_id}",
+            params={"fields": "snapshot_id"},
+            headers=self._make_client_auth_header(token),
+        )
+        return response.get("snapshot_id")
+
     async def create_user_playlist(self, token: SpotifyToken, name: str) -> Playlist:
         user_info = await self._get_current_user_info(token.access_token)
         response = await self.http_client.post(
@@ -152,30 +269,55 @@ class SpotifyTransferClient[TAuthData: SpotifyAuthData, TToken: SpotifyToken](
         )
 
     async def add_tracks_to_playlist(
-            self, token: SpotifyToken, playlist_id: str, *tracks_ids: list[str]
-    ) -> None:
-        await self.http_client.post(
-            self.API_URL + f"/v1/playlists/{playlist_id}/tracks",
-            json={"uris": tracks_ids},
-            headers={"Authorization": "Bearer " + token.access_token},
+            self, token: SpotifyToken, playlist_id: str, *tracks_ids: str
+    ) -> list[PlaylistTracksAddResult]:
+        results = []
+        # Chunks are sent one by one to keep tracks order
+        for offset in range(0, len(tracks_ids), self.ADD_TRACKS_CHUNK_SIZE):
+            chunk = tracks_ids[offset:offset + self.ADD_TRACKS_CHUNK_SIZE]
+            response = await self.http_client.post(
+                self.API_URL + f"/v1/playlists/{playlist_id}/tracks",
+                json={"uris": list(chunk)},
+                headers=self._make_client_auth_header(token),
+            )
+            results.append(
+                PlaylistTracksAddResult(offset=offset, tracks_count=len(chunk), snapshot_id=response.get("snapshot_id"))
+            )
+        return results
+
+    async def search_for_track(
+            self, token: SpotifyToken, track: str, artist: str, duration_ms: int | None = None, isrc: str | None = None
+    ) -> str:
+        if isrc:
+            # Exact recording, no ranking needed
+            candidates = await self._search_tracks(token, f"isrc:{isrc}", 1)
+            metrics.inc("spotify_isrc_search_total", result="hit" if candidates else "miss")
+            if candidates:
+                return candidates[0].track.uri
+
+        candidates = await self._search_tracks(token, f"track:{track} artist:{artist}", self.SEARCH_CANDIDATES)
+        uris = {candidate.track.id: candidate.track.uri for candidate in candidates}
+        match = best_match(
+            TrackFeatures.from_values(track, artist, duration_ms),
+            [self._track_to_domain(candidate) for candidate in candidates],
+            settings.TRACK_MATCH_MIN_SCORE,
         )
+        if match is None:
+            raise ExternalApiEmptyResponseError()
+        return uris[match.source_id]
 
-    async def search_for_track(self, token: SpotifyToken, track: str, artist: str) -> str:
-        query = f"track:{track} artist:{artist}"
-        query  = query.replace(" ", "%20").replace(":", "%3A")
+    async def _search_tracks(self, token: SpotifyToken, query: str, limit: int) -> list[SpotifyTrack]:
+        # Query is sent as is, http client encodes params itself
         response = await self.http_client.get(
             self.API_URL + "/v1/search",
             headers={"Authorization": "Bearer " + token.access_token},
-            params={"q": query, "type": "track", "limit": 1},
+            params={"q": query, "type": "track", "limit": limit},
         )
         try:
             result = SpotifyResponse.model_validate(response.get("tracks"))
-            if not result.items:
-                raise ExternalApiEmptyResponseError()
-            track = SpotifyTrack.model_validate({"track": result.items[0]})
+            return [SpotifyTrack.model_validate({"track": i}) for i in result.items if i]
         except ValidationError as e:
             raise ExternalApiInvalidResponseError(str(e))
-        return track.track.uri
 
     async def search_for_album(
             self, token: SpotifyToken, name: str, artist: str
@@ -194,7 +336,7 @@ class SpotifyTransferClient[TAuthData: SpotifyAuthData, TToken: SpotifyToken](
             raise ExternalApiInvalidResponseError(str(e))
         return album.album.id
 
-    async def _refresh_token(self, token: SpotifyToken) -> SpotifyToken:
+    async def refresh_token(self, token: SpotifyToken) -> SpotifyToken:
         response = await self.http_client.post(
             "https://accounts.spotify.com/api/token",
             data=urlencode(
@@ -202,24 +344,32 @@ class SpotifyTransferClient[TAuthData: SpotifyAuthData, TToken: SpotifyToken](
             headers={"Content-Type": "application/x-www-form-urlencoded"},
         )
         try:
-            result = SpotifyToken.model_validate(response)
+            # Spotify may not rotate refresh token
+            result = SpotifyToken.model_validate({"refresh_token": token.refresh_token} | response)
         except ValidationError as e:
             raise ExternalApiInvalidResponseError(str(e))
+        if response.get("expires_in"):
+            result.expires_at = time.time() + response["expires_in"]
+        logger.info(f"Refreshed token: {result}")
         return result
 
-    async def parse_and_validate_token(self, token_raw: str) -> SpotifyToken:
+    def parse_token(self, token_raw: str) -> SpotifyToken:
         try:
-            token = SpotifyToken.model_validate_json(token_raw)
+            return SpotifyToken.model_validate_json(token_raw)
         except ValidationError:
             raise ValueError("Invalid token")
 
+    async def validate_token(self, token: SpotifyToken) -> bool:
+        if token.expires_at is not None:
+            return token.expires_at - time.time() > settings.TOKEN_REFRESH_MARGIN
+        if self._validated_tokens.get(token.access_token):
+            return True
         try:
             await self._get_current_user_info(token.access_token)
-        except ExternalApiUnauthorizedError as e:
-            token = await self._refresh_token(token)
-            logger.info(f"Refreshed token: {token}")
-
-        return token
+        except ExternalApiUnauthorizedError:
+            return False
+        self._validated_tokens.set(token.access_token, True)
+        return True
 
     def _make_server_auth_header_token(self) -> str:
         return (
@@ -232,6 +382,11 @@ class SpotifyTransferClient[TAuthData: SpotifyAuthData, TToken: SpotifyToken](
     def _make_client_auth_header(self, token: SpotifyToken) -> dict[str, str]:
         return {"Authorization": "Bearer " + token.access_token}
 
+    @staticmethod
+    def _is_track_item(item: dict) -> bool:
+        """Playlist item is null for unavailable tracks and can be a podcast episode"""
+        return bool(item.get("track")) and item["track"].get("type", "track") == "track"
+
     @staticmethod
     def _playlist_to_domain(model: SpotifyPlaylist) -> Playlist:
         return Playlist(
@@ -250,6 +405,8 @@ class SpotifyTransferClient[TAuthData: SpotifyAuthData, TToken: SpotifyToken](
             source=MusicSource.SPOTIFY,
             name=model.track.name,
             artist_name=" ".join(i.name for i in model.track.artists),
+            duration_ms=model.track.duration_ms,
+            isrc=model.track.external_ids.isrc if model.track.external_ids else None,
         )
 
     @staticmethod
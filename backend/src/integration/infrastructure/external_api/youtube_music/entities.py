@@ -4,6 +4,7 @@ from pydantic import BaseModel, Field, AliasChoices
 class YoutubeToken(BaseModel):
     token: str = Field(validation_alias=AliasChoices("token", "access_token"))
     refresh_token: str = Field(validation_alias=AliasChoices("refresh_token"))
+    expires_at: float | None = Field(description="Unix timestamp. Unknown for tokens passed by client", default=None)
 
 
 class YoutubeResponse(BaseModel):
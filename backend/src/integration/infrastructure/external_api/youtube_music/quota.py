@@ -0,0 +1,107 @@
+import asyncio
+import datetime as dt
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from src.core.config import settings
+from src.core.metrics import metrics
+from src.db.engine import async_session_maker
+from src.integration.domain.entities import MusicSource
+from src.integration.domain.exceptions import ExternalApiQuotaExceededError
+from src.integration.infrastructure.db.orm import ApiQuotaUsageDB
+
+try:
+    QUOTA_TIMEZONE = ZoneInfo("America/Los_Angeles")
+except ZoneInfoNotFoundError:
+    QUOTA_TIMEZONE = dt.timezone(dt.timedelta(hours=-8))
+
+
+class YoutubeQuota:
+    """
+    Accounting of YouTube Data API units spent by all api and worker processes.
+    Units are kept in database row of quota day, daily quota is reset at midnight Pacific Time.
+    Each process reserves units from the row by batches and spends them locally,
+    unspent units are returned by release on shutdown
+    """
+    LIST_COST: int = 1
+    INSERT_COST: int = 50
+    UPDATE_COST: int = 50
+    SEARCH_COST: int = 100
+
+    def __init__(self, daily_limit: int, batch_size: int = 1, session_factory=async_session_maker) -> None:
+        self.daily_limit = daily_limit
+        self.batch_size = batch_size
+        self.session_factory = session_factory
+        self._lock = asyncio.Lock()
+        self._reserved = 0
+        self._reserved_day: dt.date | None = None
+
+    @staticmethod
+    def _today() -> dt.date:
+        return dt.datetime.now(QUOTA_TIMEZONE).date()
+
+    def _local_remaining(self, day: dt.date) -> int:
+        # Reservation of previous day is useless, quota is reset
+        return self._reserved if self._reserved_day == day else 0
+
+    async def get_remaining(self) -> int:
+        day = self._today()
+        query = select(ApiQuotaUsageDB.used).filter_by(source=MusicSource.YOUTUBE.value, day=day)
+        async with self.session_factory() as session:
+            used = await session.scalar(query) or 0
+        return max(self.daily_limit - used, 0) + self._local_remaining(day)
+
+    async def spend(self, units: int) -> None:
+        """Spend units before request. Raise, if request would exceed daily quota"""
+        async with self._lock:
+            day = self._today()
+            reserved = self._local_remaining(day)
+            if reserved < units:
+                needed = units - reserved
+                # Near the end of quota batch may not fit, then only needed units are reserved
+                for amount in dict.fromkeys((max(needed, self.batch_size), needed)):
+                    if (used := await self._reserve(day, amount)) is not None:
+                        reserved += amount
+                        metrics.set("youtube_quota_used", used)
+                        break
+                else:
+                    self._reserved, self._reserved_day = reserved, day
+                    metrics.inc("youtube_quota_rejected_total")
+                    raise ExternalApiQuotaExceededError(
+                        f"Youtube daily quota exceeded: {units} units requested, "
+                        f"{await self.get_remaining()} remaining"
+                    )
+            self._reserved, self._reserved_day = reserved - units, day
+
+    async def release(self) -> None:
+        """Return units reserved, but not spent by this process, to shared quota"""
+        async with self._lock:
+            if not (reserved := self._local_remaining(self._today())):
+                return
+            query = update(ApiQuotaUsageDB).filter_by(source=MusicSource.YOUTUBE.value, day=self._reserved_day) \
+                .values(used=func.greatest(ApiQuotaUsageDB.used - reserved, 0), updated_at=func.now())
+            async with self.session_factory() as session:
+                await session.execute(query)
+                await session.commit()
+            self._reserved = 0
+
+    async def _reserve(self, day: dt.date, units: int) -> int | None:
+        """Units used by all processes after reservation or None, if units don't fit into quota"""
+        if units > self.daily_limit:
+            return None
+        query = insert(ApiQuotaUsageDB).values(source=MusicSource.YOUTUBE.value, day=day, used=units)
+        # Check and increment are one statement, so concurrent processes can't exceed quota together
+        query = query.on_conflict_do_update(
+            index_elements=[ApiQuotaUsageDB.source, ApiQuotaUsageDB.day],
+            set_={"used": ApiQuotaUsageDB.used + units, "updated_at": func.now()},
+            where=ApiQuotaUsageDB.used + units <= self.daily_limit,
+        ).returning(ApiQuotaUsageDB.used)
+        async with self.session_factory() as session:
+            used = await session.scalar(query)
+            await session.commit()
+        return used
+
+
+youtube_quota = YoutubeQuota(settings.YOUTUBE_DAILY_QUOTA, settings.YOUTUBE_QUOTA_BATCH)
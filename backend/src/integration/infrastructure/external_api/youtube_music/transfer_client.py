@@ -1,12 +1,16 @@
+import asyncio
 import json
-from typing import Type, TypeVar
+import time
+from typing import AsyncIterator, Literal, Type, TypeVar
 
 from loguru import logger
 from pydantic import BaseModel, ValidationError
 
+from src.core.cache import TTLCache
 from src.core.config import settings
 from src.integration.application.interfaces.http_client import IHTTPClient
-from src.integration.domain.entities import Album, Track, Playlist, MusicSource
+from src.integration.domain.entities import Album, Track, Playlist, MusicSource, PlaylistTracksAddResult, TracksPage
+from src.integration.domain.matching import TrackFeatures, best_match
 from src.integration.domain.exceptions import (
     ExternalApiError,
     ExternalApiUnauthorizedError,
@@ -19,6 +23,7 @@ from src.integration.infrastructure.external_api.youtube_music.entities import (
     YoutubePlaylist,
     YoutubeResponse,
 )
+from src.integration.infrastructure.external_api.youtube_music.quota import YoutubeQuota, youtube_quota
 from src.integration.infrastructure.http.api_client import HTTPApiClient
 from src.transfer.application.interfaces.transfer_client import ITransferClient
 
@@ -30,6 +35,15 @@ class YoutubeMusicTransferClient[TToken: YoutubeToken](ITransferClient):
     API_CLIENT_ID: str = settings.YOUTUBE_CLIENT_ID
     API_CLIENT_SECRET: str = settings.YOUTUBE_CLIENT_SECRET
     SOURCE: str = MusicSource.YOUTUBE.value
+    SEARCH_CONCURRENCY: int = settings.YOUTUBE_SEARCH_CONCURRENCY
+    SEARCH_CANDIDATES: int = settings.TRACK_SEARCH_CANDIDATES
+    ADD_TRACKS_CHUNK_SIZE: int = 50
+    PAGE_SIZE: int = 50
+    PLAYLIST_FIELDS: str = "nextPageToken,items(id,etag,snippet(title,thumbnails,channelTitle))"
+    PLAYLIST_ITEM_FIELDS: str = (
+        "nextPageToken,pageInfo/totalResults,"
+        "items(id,etag,snippet(title,channelTitle,videoOwnerChannelTitle,playlistId,thumbnails,resourceId))"
+    )
     SCOPES: tuple = (
         "https://www.googleapis.com/auth/youtubepartner",
         "https://www.googleapis.com/auth/youtube",
@@ -37,13 +51,48 @@ class YoutubeMusicTransferClient[TToken: YoutubeToken](ITransferClient):
         "https://www.googleapis.com/auth/youtubepartner-channel-audit",
     )
 
-    def __init__(self, http_client: IHTTPClient) -> None:
+    # Shared by all instances, access token -> True
+    _validated_tokens: TTLCache[str, bool] = TTLCache(10000, settings.TOKEN_VALIDATION_CACHE_TTL)
+
+    def __init__(self, http_client: IHTTPClient, quota: YoutubeQuota = youtube_quota) -> None:
         self.api = HTTPApiClient(http_client, self.API_URL)
+        self.quota = quota
+
+    async def _request(self, method: Literal["POST", "GET", "PUT"], path: str, quota_cost: int, **kwargs) -> dict:
+        await self.quota.spend(quota_cost)
+        return await self.api.request(method, path, **kwargs)
+
+    async def _iter_pages(self, token: YoutubeToken, path: str, params: dict) -> AsyncIterator[dict]:
+        """Follow nextPageToken. Next page is requested while the current one is processed by caller"""
+        params = params | {"maxResults": self.PAGE_SIZE}
+
+        def request_page(page_token: str | None = None) -> asyncio.Task:
+            page_params = params | {"pageToken": page_token} if page_token else params
+            return asyncio.create_task(
+                self._request("GET", path, self.quota.LIST_COST, bearer_token=token.token, params=page_params)
+            )
+
+        next_page: asyncio.Task | None = request_page()
+        try:
+            while next_page is not None:
+                response = await next_page
+                next_page = None
+                if page_token := response.get("nextPageToken"):
+                    next_page = request_page(page_token)
+                yield response
+        finally:
+            if next_page is not None:
+                next_page.cancel()
+
+    async def _get_all_items(self, token: YoutubeToken, path: str, params: dict, items_model: Type[T]) -> list[T]:
+        items = [item async for page in self._iter_pages(token, path, params) for item in page.get("items", [])]
+        return self._parse_response({"items": items}, items_model)
 
     async def _get_current_user_info(self, token: YoutubeToken) -> dict:
-        response = await self.api.request(
+        response = await self._request(
             "GET",
             "/youtube/v3/channels",
+            self.quota.LIST_COST,
             bearer_token=token.token,
             params={"part": "snippet", "mine": 1},
         )
@@ -51,51 +100,70 @@ class YoutubeMusicTransferClient[TToken: YoutubeToken](ITransferClient):
             raise ExternalApiEmptyResponseError()
         return response.get("items")[0]
 
-    async def get_user_favorites_tracks(self, token: YoutubeToken, total=None, offset=0, count=50) -> list[Track]:
+    async def get_user_favorites_tracks(self, token: YoutubeToken) -> list[Track]:
         raise ExternalApiError("Youtube not implemented favorites tracks")
 
     async def get_user_playlists(self, token: YoutubeToken) -> list[Playlist]:
-        response = await self.api.request(
-            "GET",
+        playlists = await self._get_all_items(
+            token,
             "/youtube/v3/playlists",
-            bearer_token=token.token,
-            params={"maxResults": 50, "mine": 1, "part": "snippet,id"},
+            {"mine": 1, "part": "snippet", "fields": self.PLAYLIST_FIELDS},
+            YoutubePlaylist,
         )
-        playlists = self._parse_response(response, YoutubePlaylist)
         return [self._playlist_to_domain(playlist) for playlist in playlists]
 
     async def get_user_playlist_tracks(self, token: YoutubeToken, playlist_id: str) -> list[Track]:
-        response = await self.api.request(
-            "GET",
+        tracks = await self._get_all_items(
+            token,
             "/youtube/v3/playlistItems",
-            bearer_token=token.token,
-            params={"playlistId": playlist_id, "maxResults": 50, "part": "snippet"},
+            {"playlistId": playlist_id, "part": "snippet", "fields": self.PLAYLIST_ITEM_FIELDS},
+            YoutubeTrack,
         )
-        tracks = self._parse_response(response, YoutubeTrack)
         return [self._track_to_domain(track) for track in tracks]
 
+    async def iter_user_playlist_tracks(self, token: YoutubeToken, playlist_id: str) -> AsyncIterator[TracksPage]:
+        params = {"playlistId": playlist_id, "part": "snippet", "fields": self.PLAYLIST_ITEM_FIELDS}
+        async for page in self._iter_pages(token, "/youtube/v3/playlistItems", params):
+            tracks = self._parse_response({"items": page.get("items", [])}, YoutubeTrack)
+            yield TracksPage(
+                tracks=[self._track_to_domain(track) for track in tracks],
+                total=page.get("pageInfo", {}).get("totalResults"),
+            )
+
     async def create_user_playlist(self, token: YoutubeToken, name: str) -> Playlist:
         resource = {"snippet": {"title": name}, "status": {"privacyStatus": "public"}}
-        response = await self.api.request("POST", "/youtube/v3/playlists", bearer_token=token.token, json=resource,
-                                          params={"part": "snippet,status"})
+        response = await self._request("POST", "/youtube/v3/playlists", self.quota.INSERT_COST,
+                                       bearer_token=token.token, json=resource, params={"part": "snippet,status"})
         try:
             playlist = YoutubePlaylist.model_validate(response)
         except ValidationError as e:
             raise ExternalApiInvalidResponseError() from e
         return self._playlist_to_domain(playlist)
 
-    async def search_for_track(self, token: YoutubeToken, track: str, artist: str) -> str:
+    async def search_for_track(
+            self, token: YoutubeToken, track: str, artist: str, duration_ms: int | None = None,
+            isrc: str | None = None,  # noqa: ARG002
+    ) -> str:
+        """Youtube search has no isrc filter. Results have no duration, it would cost additional videos.list request"""
         query = track + " " + artist
-        response = await self.api.request(
+        response = await self._request(
             "GET",
             "/youtube/v3/search",
+            self.quota.SEARCH_COST,
             bearer_token=token.token,
-            params={"part": "snippet", "q": query, "type": "video", "videoCategoryId": "10", "maxResults": 1},
+            params={
+                "part": "snippet", "q": query, "type": "video", "videoCategoryId": "10",
+                "maxResults": self.SEARCH_CANDIDATES,
+            },
         )
-        tracks: list[YoutubeTrack] = self._parse_response(response, YoutubeTrack)
-        return json.dumps(tracks[0].id) if isinstance(tracks[0].id, dict) else tracks[0].id
+        candidates = [self._search_result_to_domain(i) for i in self._parse_response(response, YoutubeTrack)]
+        match = best_match(
+            TrackFeatures.from_values(track, artist, duration_ms), candidates, settings.TRACK_MATCH_MIN_SCORE)
+        if match is None:
+            raise ExternalApiEmptyResponseError()
+        return match.source_id
 
-    async def _refresh_token(self, token: YoutubeToken) -> YoutubeToken:
+    async def refresh_token(self, token: YoutubeToken) -> YoutubeToken:
         json = {
             "client_id": self.API_CLIENT_ID,
             "client_secret": self.API_CLIENT_SECRET,
@@ -109,29 +177,70 @@ class YoutubeMusicTransferClient[TToken: YoutubeToken](ITransferClient):
             data=data,
             headers={"Content-Type": "application/x-www-form-urlencoded"},
         )
-        return YoutubeToken(token=response.get("access_token"), refresh_token=token.refresh_token)
+        expires_at = time.time() + response["expires_in"] if response.get("expires_in") else None
+        return YoutubeToken(
+            token=response.get("access_token"), refresh_token=token.refresh_token, expires_at=expires_at)
 
-    async def parse_and_validate_token(self, token_raw: str) -> YoutubeToken:
-        token = YoutubeToken.model_validate_json(token_raw)
+    def parse_token(self, token_raw: str) -> YoutubeToken:
+        return YoutubeToken.model_validate_json(token_raw)
+
+    async def validate_token(self, token: YoutubeToken) -> bool:
+        if token.expires_at is not None:
+            return token.expires_at - time.time() > settings.TOKEN_REFRESH_MARGIN
+        if self._validated_tokens.get(token.token):
+            return True
         try:
-            user = await self._get_current_user_info(token)
+            await self._get_current_user_info(token)
         except (ExternalApiEmptyResponseError, ExternalApiUnauthorizedError):
-            token = await self._refresh_token(token)
-        return token
+            return False
+        self._validated_tokens.set(token.token, True)
+        return True
 
     async def get_user_albums(self, token: YoutubeToken) -> list[Album]:
         raise ExternalApiError("Youtube not implemented user albums")
 
+    async def get_album(self, token: YoutubeToken, album_id: str) -> Album:  # noqa: ARG002
+        raise ExternalApiError("Youtube not implemented user albums")
+
     async def add_user_album(self, token: YoutubeToken, album_name: str, artist_name: str) -> None:
         raise ExternalApiError("Youtube not implemented user albums")
 
-    async def add_tracks_to_playlist(self, token: YoutubeToken, playlist_id: str, *track_ids: str) -> None:
-        for track_id in track_ids:
-            if track_id.startswith("{"):
-                track_id = json.loads(track_id)
-            resource = {"snippet": {"playlistId": playlist_id, "resourceId": track_id}}
+    async def add_tracks_to_playlist(
+            self, token: YoutubeToken, playlist_id: str, *track_ids: str
+    ) -> list[PlaylistTracksAddResult]:
+        """
+        Insert tracks one by one at explicit positions after the current end of playlist.
+        Whole chunk quota is spent up front, so transfer stops between chunks and not in the middle of one
+        """
+        resource_ids = [self._to_resource_id(track_id) for track_id in track_ids]
+        await self.quota.spend(self.quota.INSERT_COST * len(resource_ids))
+        position = await self._get_playlist_items_count(token, playlist_id)
+        for offset, resource_id in enumerate(resource_ids):
+            resource = {
+                "snippet": {"playlistId": playlist_id, "resourceId": resource_id, "position": position + offset}
+            }
             await self.api.request("POST", "/youtube/v3/playlistItems", bearer_token=token.token, json=resource,
                                    params={"part": "snippet"})
+        return [PlaylistTracksAddResult(offset=0, tracks_count=len(resource_ids))]
+
+    async def _get_playlist_items_count(self, token: YoutubeToken, playlist_id: str) -> int:
+        response = await self._request(
+            "GET",
+            "/youtube/v3/playlists",
+            self.quota.LIST_COST,
+            bearer_token=token.token,
+            params={"id": playlist_id, "part": "contentDetails", "fields": "items/contentDetails/itemCount"},
+        )
+        if not response.get("items"):
+            raise ExternalApiEmptyResponseError(f"Playlist {playlist_id} not found")
+        return response["items"][0]["contentDetails"]["itemCount"]
+
+    @staticmethod
+    def _to_resource_id(track_id: str) -> dict:
+        # Old style ids are serialized resourceId objects
+        if track_id.startswith("{"):
+            return json.loads(track_id)
+        return {"kind": "youtube#video", "videoId": track_id}
 
     @staticmethod
     def _parse_response(response: dict, items_model: Type[T]) -> list[T]:
@@ -158,6 +267,16 @@ class YoutubeMusicTransferClient[TToken: YoutubeToken](ITransferClient):
             ),
         )
 
+    @staticmethod
+    def _search_result_to_domain(model: YoutubeTrack) -> Track:
+        # Search result id is {"kind": "youtube#video", "videoId": ...} and uploader is channel itself
+        return Track(
+            source_id=model.id["videoId"] if isinstance(model.id, dict) else model.id,
+            source=MusicSource.YOUTUBE,
+            name=model.snippet.title,
+            artist_name=model.snippet.channel_title or "",
+        )
+
     @staticmethod
     def _track_to_domain(model: YoutubeTrack) -> Track:
         return Track(
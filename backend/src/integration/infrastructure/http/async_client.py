@@ -1,11 +1,64 @@
+import datetime as dt
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator
+
 import aiohttp
 from loguru import logger
 
 from src.integration.application.interfaces.http_client import IHTTPClient
-from src.integration.domain.exceptions import ExternalApiError, ExternalApiUnauthorizedError
+from src.integration.domain.exceptions import ExternalApiError, ExternalApiUnauthorizedError, \
+    ExternalApiUnavailableError, ExternalApiTooManyRequestsError, ExternalApiNotFoundError
 
 
 class HTTPAsyncClient[TResponse: dict](IHTTPClient):
+    def __init__(self, session: aiohttp.ClientSession | None = None) -> None:
+        """
+        :param session: Shared session with pooled connections.
+            If not passed, a new session is opened for each request
+        """
+        self.session = session
+
+    @asynccontextmanager
+    async def _session(self) -> AsyncIterator[aiohttp.ClientSession]:
+        if self.session is not None and not self.session.closed:
+            yield self.session
+            return
+        async with aiohttp.ClientSession() as session:
+            yield session
+
+    @staticmethod
+    def _parse_retry_after(value: str | None) -> float | None:
+        """Retry-After is either delay in seconds or HTTP-date"""
+        if not value:
+            return None
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        return max((retry_at - dt.datetime.now(dt.timezone.utc)).total_seconds(), 0.0)
+
+    async def _raise_for_status(self, response: aiohttp.ClientResponse) -> None:
+        if response.ok:
+            return
+        error_text = await response.text()
+        if response.status == 401:
+            raise ExternalApiUnauthorizedError(detail=error_text)
+        logger.warning(f"{response.method} {response.url} {response.status}: {error_text}")
+        if response.status == 429:
+            raise ExternalApiTooManyRequestsError(
+                detail=error_text, retry_after=self._parse_retry_after(response.headers.get("Retry-After"))
+            )
+        if response.status == 404:
+            raise ExternalApiNotFoundError(detail=error_text)
+        if response.status >= 500:
+            raise ExternalApiUnavailableError(detail=error_text)
+        raise ExternalApiError(detail=error_text)
+
     async def post(
             self,
             url: str,
@@ -18,15 +71,10 @@ class HTTPAsyncClient[TResponse: dict](IHTTPClient):
         if isinstance(form, dict):
             form = "&".join(f"{k}={v}" for k, v in form.items())
             data = (data or "") + form
-        async with aiohttp.ClientSession() as session:
-            response = await session.post(
-                url, headers=headers, params=params, json=json, data=data
-            )
-            if response.status == 401:
-                raise ExternalApiUnauthorizedError()
-            if not response.ok:
-                raise ExternalApiError(await response.text())
-            body = await response.json()
+        async with self._session() as session:
+            async with session.post(url, headers=headers, params=params, json=json, data=data) as response:
+                await self._raise_for_status(response)
+                body = await response.json()
         return body
 
     async def get(
@@ -36,15 +84,10 @@ class HTTPAsyncClient[TResponse: dict](IHTTPClient):
             params: dict[str, str | int] | None = None,
             **kwargs
     ) -> dict:
-        async with aiohttp.ClientSession() as session:
-            response = await session.get(url, headers=headers, params=params)
-            if response.status == 401:
-                raise ExternalApiUnauthorizedError(detail=await response.text())
-            if not response.ok:
-                error_text = await response.text()
-                logger.warning(error_text)
-                raise ExternalApiError(detail=error_text)
-            body = await response.json()
+        async with self._session() as session:
+            async with session.get(url, headers=headers, params=params) as response:
+                await self._raise_for_status(response)
+                body = await response.json()
         return body
 
     async def put(
@@ -59,16 +102,11 @@ class HTTPAsyncClient[TResponse: dict](IHTTPClient):
         if isinstance(form, dict):
             form = "&".join(f"{k}={v}" for k, v in form.items())
             data = (data or "") + form
-        async with aiohttp.ClientSession() as session:
-            response = await session.put(
-                url, headers=headers, params=params, json=json, data=data
-            )
-            if response.status == 401:
-                raise ExternalApiUnauthorizedError()
-            if not response.ok:
-                raise ExternalApiError(await response.text())
-            try:
-                body = await response.json()
-            except aiohttp.client_exceptions.ContentTypeError:
-                body = None
+        async with self._session() as session:
+            async with session.put(url, headers=headers, params=params, json=json, data=data) as response:
+                await self._raise_for_status(response)
+                try:
+                    body = await response.json()
+                except aiohttp.client_exceptions.ContentTypeError:
+                    body = None
         return body
@@ -0,0 +1,144 @@
+import asyncio
+import random
+import time
+from urllib.parse import urlsplit
+
+from loguru import logger
+
+from src.core.metrics import metrics
+from src.integration.application.interfaces.http_client import IHTTPClient
+from src.integration.domain.exceptions import ExternalApiTooManyRequestsError, ExternalApiUnavailableError
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float | None = None) -> None:
+        self.rate = rate
+        self.capacity = capacity or rate
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def pause(self, seconds: float) -> None:
+        """Stop giving tokens for a while, e.g. after provider responded with Retry-After"""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    async def acquire(self) -> float:
+        """Take one token, waiting if needed. Return waited seconds"""
+        waited = 0.0
+        async with self._lock:
+            while True:
+                delay = self._paused_until - time.monotonic()
+                if delay <= 0:
+                    self._refill()
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return waited
+                    delay = (1 - self._tokens) / self.rate
+                await asyncio.sleep(delay)
+                waited += delay
+
+
+class HTTPRateLimiter:
+    """Token buckets per provider host, shared by all clients of the process"""
+
+    def __init__(self, rates: dict[str, float], default_rate: float) -> None:
+        self.rates = rates
+        self.default_rate = default_rate
+        self._buckets: dict[str, TokenBucket] = {}
+
+    def get_bucket(self, host: str) -> TokenBucket:
+        if host not in self._buckets:
+            self._buckets[host] = TokenBucket(self.rates.get(host, self.default_rate))
+        return self._buckets[host]
+
+
+class RateLimitedHTTPClient[TResponse](IHTTPClient[TResponse]):
+    """
+    Wraps IHTTPClient with per host rate limit and retries.
+    429 is retried for any method, honoring Retry-After. 5xx is retried only for idempotent methods.
+    """
+    IDEMPOTENT_METHODS: tuple[str, ...] = ("get", "put")
+
+    def __init__(
+            self,
+            client: IHTTPClient[TResponse],
+            limiter: HTTPRateLimiter,
+            max_retries: int = 5,
+            backoff_base: float = 0.5,
+            backoff_max: float = 30.0,
+    ) -> None:
+        self.client = client
+        self.limiter = limiter
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    def _backoff(self, attempt: int) -> float:
+        """Exponential backoff with full jitter"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    async def _request(self, method: str, url: str, **kwargs) -> TResponse:
+        host = urlsplit(url).hostname or ""
+        bucket = self.limiter.get_bucket(host)
+        attempt = 0
+        while True:
+            waited = await bucket.acquire()
+            if waited:
+                metrics.inc("http_rate_limit_wait_seconds_total", waited, host=host)
+            try:
+                return await getattr(self.client, method)(url, **kwargs)
+            except ExternalApiTooManyRequestsError as e:
+                metrics.inc("http_throttled_total", host=host)
+                if attempt >= self.max_retries:
+                    raise
+                if e.retry_after is not None:
+                    delay = e.retry_after + random.uniform(0, self.backoff_base)
+                else:
+                    delay = self._backoff(attempt)
+                # Whole host is throttled, not only this request
+                bucket.pause(delay)
+            except ExternalApiUnavailableError:
+                if method not in self.IDEMPOTENT_METHODS or attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                await asyncio.sleep(delay)
+            attempt += 1
+            metrics.inc("http_retried_total", host=host)
+            logger.warning(f"Retry {attempt}/{self.max_retries} {method.upper()} {url} in {delay:.2f}s")
+
+    async def get(
+            self,
+            url: str,
+            headers: dict[str, str] | None = None,
+            params: dict[str, str | int] | None = None,
+            **kwargs
+    ) -> TResponse:
+        return await self._request("get", url, headers=headers, params=params, **kwargs)
+
+    async def post(
+            self,
+            url: str,
+            headers: dict[str, str] | None = None,
+            params: dict[str, str | int] | None = None,
+            json: dict | None = None,
+            data: str | None = None,
+            form: dict[str, str | int] | str | None = None
+    ) -> TResponse:
+        return await self._request("post", url, headers=headers, params=params, json=json, data=data, form=form)
+
+    async def put(
+            self,
+            url: str,
+            headers: dict[str, str] | None = None,
+            params: dict[str, str | int] | None = None,
+            json: dict | None = None,
+            data: str | None = None,
+            form: dict[str, str | int] | str | None = None
+    ) -> TResponse:
+        return await self._request("put", url, headers=headers, params=params, json=json, data=data, form=form)
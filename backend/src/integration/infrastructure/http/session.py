@@ -0,0 +1,40 @@
+import aiohttp
+
+from src.core.config import settings
+
+_session: aiohttp.ClientSession | None = None
+
+
+def _make_session() -> aiohttp.ClientSession:
+    connector = aiohttp.TCPConnector(
+        limit=settings.HTTP_CONNECTIONS_LIMIT,
+        limit_per_host=settings.HTTP_CONNECTIONS_LIMIT_PER_HOST,
+        keepalive_timeout=settings.HTTP_KEEPALIVE_TIMEOUT,
+        ttl_dns_cache=settings.HTTP_DNS_CACHE_TTL,
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(total=settings.HTTP_REQUEST_TIMEOUT),
+    )
+
+
+async def open_http_session() -> aiohttp.ClientSession:
+    """Create the process-wide session. Must be called inside the running event loop"""
+    global _session
+    if _session is None or _session.closed:
+        _session = _make_session()
+    return _session
+
+
+async def close_http_session() -> None:
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+
+def get_http_session() -> aiohttp.ClientSession | None:
+    """Return shared session or None, if app lifespan is not started"""
+    if _session is None or _session.closed:
+        return None
+    return _session
@@ -1,9 +1,38 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
 
+from fastapi import Depends, FastAPI
+
+from src.core.auth import validate_api_token_header
+from src.core.config import settings
+from src.db.metrics_store import metrics_store
 from src.core.logging_setup import setup_fastapi_logging
+from src.integration.infrastructure.external_api.youtube_music.quota import youtube_quota
+from src.integration.infrastructure.http.session import close_http_session, open_http_session
+from src.transfer.api.dependencies import transfer_events
 from src.transfer.api.rest import router as transfer_router
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    await open_http_session()
+    await transfer_events.start()
+    metrics_export = asyncio.create_task(metrics_store.run(settings.METRICS_EXPORT_INTERVAL))
+    yield
+    metrics_export.cancel()
+    await transfer_events.stop()
+    await youtube_quota.release()
+    await close_http_session()
+
+
+app = FastAPI(lifespan=lifespan)
 setup_fastapi_logging(app)
 
 app.include_router(transfer_router, tags=["Transfer"], prefix="/api/transfer")
+
+
+@app.get("/api/metrics", tags=["Metrics"], dependencies=[Depends(validate_api_token_header)])
+async def get_metrics() -> dict[str, float]:
+    """Metrics of all api and worker processes"""
+    await metrics_store.save()
+    return await metrics_store.load()
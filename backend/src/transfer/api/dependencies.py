@@ -2,12 +2,26 @@ from typing import Annotated
 
 from fastapi import Depends, HTTPException, Query
 
+from src.core.config import settings
 from src.integration.api.dependencies import get_spotify_client, get_youtube_client
+from src.transfer.application.interfaces.track_match_cache import ITrackMatchCache
+from src.transfer.application.interfaces.transfer_events import ITransferEvents
 from src.transfer.application.interfaces.transfer_client import ITransferClient
 from src.transfer.application.interfaces.unit_of_work import ITransferUnitOfWork
 from src.transfer.domain.entities import TransferSource
+from src.transfer.infrastructure.cache.track_match_cache import TieredTrackMatchCache
+from src.transfer.infrastructure.db.track_match_cache import PGTrackMatchCache
+from src.transfer.infrastructure.db.transfer_events import PGTransferEvents
 from src.transfer.infrastructure.db.unit_of_work import PGTransferUnitOfWork
 
+track_match_cache = TieredTrackMatchCache(
+    PGTrackMatchCache(settings.TRACK_MATCH_CACHE_TTL, settings.TRACK_MATCH_CACHE_NEGATIVE_TTL),
+    maxsize=settings.TRACK_MATCH_CACHE_SIZE,
+    ttl=settings.TRACK_MATCH_CACHE_TTL,
+    negative_ttl=settings.TRACK_MATCH_CACHE_NEGATIVE_TTL,
+)
+transfer_events = PGTransferEvents(settings.DATABASE_URI.replace("+asyncpg", ""))
+
 
 def get_transfer_client(source: TransferSource = Query()) -> ITransferClient:
     if source == TransferSource.SPOTIFY:
@@ -29,7 +43,17 @@ def get_transfer_uow() -> ITransferUnitOfWork:
     return PGTransferUnitOfWork()
 
 
+def get_track_match_cache() -> ITrackMatchCache:
+    return track_match_cache
+
+
+def get_transfer_events() -> ITransferEvents:
+    return transfer_events
+
+
 TransferClientDepend = Annotated[ITransferClient, Depends(get_transfer_client)]
 FromTransferClientDepend = Annotated[ITransferClient, Depends(get_from_transfer_client)]
 ToTransferClientDepend = Annotated[ITransferClient, Depends(get_to_transfer_client)]
 TransferUoWDepend = Annotated[ITransferUnitOfWork, Depends(get_transfer_uow)]
+TrackMatchCacheDepend = Annotated[ITrackMatchCache, Depends(get_track_match_cache)]
+TransferEventsDepend = Annotated[ITransferEvents, Depends(get_transfer_events)]
@@ -1,23 +1,26 @@
 from uuid import UUID
 
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 
 from src.core.auth import validate_api_token_header
+from src.core.config import settings
 from src.transfer.api.dependencies import FromTransferClientDepend, ToTransferClientDepend, TransferClientDepend, \
-    TransferUoWDepend
+    TransferUoWDepend, TransferEventsDepend
 from src.transfer.application.use_cases.connect_source import ConnectSourceUseCase
 from src.transfer.application.use_cases.create_transfer import CreateTransferUseCase
 from src.transfer.application.use_cases.get_transfer import GetTransferUseCase
 from src.transfer.application.use_cases.list_playlist_tracks import ListPlaylistTracksUseCase
+from src.transfer.application.use_cases.list_transfer_history import ListTransferHistoryUseCase
+from src.transfer.application.use_cases.list_transfers import ListTransfersUseCase
 from src.transfer.application.use_cases.list_user_albums import ListUserAlbumsUseCase
 from src.transfer.application.use_cases.list_user_favorite_tracks import ListUserFavoriteTracksUseCase
 from src.transfer.application.use_cases.list_user_playlists import ListUserPlaylistsUseCase
-from src.transfer.application.use_cases.run_album_transfer import RunAlbumTransferUseCase
-from src.transfer.application.use_cases.run_favorite_transfer import RunFavoriteTransferUseCase
-from src.transfer.application.use_cases.run_playlist_transfer import RunPlaylistTransferUseCase
+from src.transfer.application.use_cases.resume_transfer import ResumeTransferUseCase
+from src.transfer.application.use_cases.watch_transfer import WatchTransferUseCase
 from src.transfer.domain.dtos import PlaylistReadDTO, PlaylistTracksListDTO, TrackReadDTO, TransferAlbumCreateDTO, \
     TransferPlaylistCreateDTO, TransferReadDTO, UserAlbumListDTO, UserPlaylistListDTO, UserSourceConnectDTO, \
-    TransferFavoriteCreateDTO
+    TransferFavoriteCreateDTO, TransferHistoryListDTO, TransferHistoryReadDTO
 
 router = APIRouter(dependencies=[Depends(validate_api_token_header)])
 
@@ -29,31 +32,20 @@ async def connect_source(data: UserSourceConnectDTO, transfer_client: TransferCl
 
 @router.post("/playlist", response_model=TransferReadDTO)
 async def start_playlist_transfer(data: TransferPlaylistCreateDTO, from_transfer_client: FromTransferClientDepend,
-                                  to_transfer_client: ToTransferClientDepend, uow: TransferUoWDepend,
-                                  background_tasks: BackgroundTasks):
-    transfer = await CreateTransferUseCase(uow).execute(from_transfer_client.SOURCE, to_transfer_client.SOURCE, data)
-    background_tasks.add_task(RunPlaylistTransferUseCase(from_transfer_client, to_transfer_client, uow).execute,
-                              transfer.id, data)
-    return transfer
+                                  to_transfer_client: ToTransferClientDepend, uow: TransferUoWDepend):
+    return await CreateTransferUseCase(uow).execute(from_transfer_client.SOURCE, to_transfer_client.SOURCE, data)
 
 
 @router.post("/album", response_model=TransferReadDTO)
 async def start_album_transfer(data: TransferAlbumCreateDTO, from_transfer_client: FromTransferClientDepend,
-                               to_transfer_client: ToTransferClientDepend, uow: TransferUoWDepend,
-                               background_tasks: BackgroundTasks):
-    transfer = await CreateTransferUseCase(uow).execute(from_transfer_client.SOURCE, to_transfer_client.SOURCE, data)
-    background_tasks.add_task(RunAlbumTransferUseCase(from_transfer_client, to_transfer_client, uow).execute,
-                              transfer.id, data)
-    return transfer
+                               to_transfer_client: ToTransferClientDepend, uow: TransferUoWDepend):
+    return await CreateTransferUseCase(uow).execute(from_transfer_client.SOURCE, to_transfer_client.SOURCE, data)
 
 
 @router.post("/favorite", response_model=TransferReadDTO)
 async def start_favorite_transfer(data: TransferFavoriteCreateDTO, from_transfer_client: FromTransferClientDepend,
-                                  to_transfer_client: ToTransferClientDepend, uow: TransferUoWDepend,
-                                  background_tasks: BackgroundTasks):
-    transfer = await CreateTransferUseCase(uow).execute(from_transfer_client.SOURCE, to_transfer_client.SOURCE, data)
-    background_tasks.add_task(RunFavoriteTransferUseCase(from_transfer_client, to_transfer_client, uow).execute, transfer.id, data)
-    return transfer
+                                  to_transfer_client: ToTransferClientDepend, uow: TransferUoWDepend):
+    return await CreateTransferUseCase(uow).execute(from_transfer_client.SOURCE, to_transfer_client.SOURCE, data)
 
 
 @router.get("/playlist", response_model=list[PlaylistReadDTO])
@@ -86,6 +78,33 @@ async def get_user_albums(transfer_client: TransferClientDepend, uow: TransferUo
     return await ListUserAlbumsUseCase(transfer_client, uow).execute(params)
 
 
+@router.get("", response_model=list[TransferReadDTO])
+async def get_transfers(uow: TransferUoWDepend, ids: list[UUID] = Query(max_length=100)):
+    return await ListTransfersUseCase(uow).execute(ids)
+
+
+@router.get("/history", response_model=TransferHistoryReadDTO)
+async def get_transfer_history(uow: TransferUoWDepend, params: TransferHistoryListDTO = Depends()):
+    return await ListTransferHistoryUseCase(uow).execute(params)
+
+
 @router.get("/{transfer_id}", response_model=TransferReadDTO)
-async def get_transfer(transfer_id: UUID, uow: TransferUoWDepend):
-    return await GetTransferUseCase(uow).execute(transfer_id)
+async def get_transfer(transfer_id: UUID, uow: TransferUoWDepend, events: TransferEventsDepend,
+                       wait: float | None = Query(None, gt=0, le=settings.TRANSFER_LONG_POLL_MAX_WAIT)):
+    """With wait, response is returned after the next transfer change or wait seconds"""
+    if wait is None:
+        return await GetTransferUseCase(uow).execute(transfer_id)
+    return await WatchTransferUseCase(uow, events).wait(transfer_id, wait)
+
+
+@router.get("/{transfer_id}/events")
+async def get_transfer_events(transfer_id: UUID, uow: TransferUoWDepend, events: TransferEventsDepend):
+    # Not existed transfer must fail before stream is started
+    await GetTransferUseCase(uow).execute(transfer_id)
+    stream = WatchTransferUseCase(uow, events).stream(transfer_id, settings.TRANSFER_EVENTS_KEEPALIVE_INTERVAL)
+    return StreamingResponse(stream, media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+@router.post("/{transfer_id}/resume", response_model=TransferReadDTO)
+async def resume_transfer(transfer_id: UUID, uow: TransferUoWDepend):
+    return await ResumeTransferUseCase(uow).execute(transfer_id)
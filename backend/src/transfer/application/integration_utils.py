@@ -1,30 +1,281 @@
+import asyncio
+from typing import AsyncIterator, Awaitable, Callable
+
 from fastapi import HTTPException
+from loguru import logger
 
+from src.core.cache import TTLCache
+from src.core.config import settings
+from src.core.metrics import metrics
+from src.core.single_flight import SingleFlight
 from src.db.exceptions import DBModelNotFoundException
+from src.integration.domain.entities import Track, MatchResult, MatchStatus, TracksPage
+from src.transfer.application.interfaces.track_match_cache import ITrackMatchCache
 from src.transfer.application.interfaces.transfer_client import ITransferClient, TToken
 from src.transfer.application.interfaces.unit_of_work import ITransferUnitOfWork
-from src.transfer.domain.entities import SourceTokenUpdate
+from src.transfer.domain.entities import SourceTokenUpdate, TrackMatch, TransferSource
+
+
+# Concurrent token loads of one user source in process share single refresh
+_token_loads: SingleFlight = SingleFlight()
+# (user_id, app_bundle, source) -> token data stored in database
+_tokens: TTLCache[tuple[str, str, str], str] = TTLCache(10000, settings.TOKEN_CACHE_TTL)
+# (destination, query_key) -> result of search running now. None if search was interrupted
+_searches: dict[tuple[str, str], asyncio.Future[MatchResult | None]] = {}
+
+
+def forget_transfer_token(user_id: str, app_bundle: str, source: str) -> None:
+    _tokens.pop((user_id, app_bundle, source))
 
 
 async def get_transfer_token(uow: ITransferUnitOfWork, transfer_client: ITransferClient, user_id: str,
                              app_bundle: str) -> TToken:
-    try:
-        source_token = await uow.source_tokens.get_by_user(
-            user_id, app_bundle, transfer_client.SOURCE
-        )
-    except DBModelNotFoundException:
-        raise HTTPException(400, detail="Source for user not connected")
-
-    token = await transfer_client.parse_and_validate_token(
-        source_token.token_data
-    )
-    # Save token each time for refresh case
-    await uow.source_tokens.update_by_user(
-        user_id,
-        app_bundle,
-        transfer_client.SOURCE,
-        SourceTokenUpdate(token_data=token.model_dump_json()),
+    return await _token_loads.run(
+        (user_id, app_bundle, transfer_client.SOURCE),
+        lambda: _load_transfer_token_isolated(uow.fork(), transfer_client, user_id, app_bundle),
     )
-    await uow.commit()
+
+
+async def _load_transfer_token_isolated(uow: ITransferUnitOfWork, transfer_client: ITransferClient, user_id: str,
+                                        app_bundle: str) -> TToken:
+    # Load is shared by all waiting callers, so it doesn't use transaction of any of them
+    async with uow:
+        return await _load_transfer_token(uow, transfer_client, user_id, app_bundle)
+
+
+async def _load_transfer_token(uow: ITransferUnitOfWork, transfer_client: ITransferClient, user_id: str,
+                               app_bundle: str) -> TToken:
+    key = (user_id, app_bundle, transfer_client.SOURCE)
+    if (token_data := _tokens.get(key)) is None:
+        try:
+            source_token = await uow.source_tokens.get_by_user(*key)
+        except DBModelNotFoundException as e:
+            raise HTTPException(400, detail="Source for user not connected") from e
+        token_data = source_token.token_data
+
+    token = transfer_client.parse_token(token_data)
+    if not await transfer_client.validate_token(token):
+        # Other workers wait for lock and then read already refreshed token
+        await uow.source_tokens.lock_by_user(*key)
+        try:
+            token_data = (await uow.source_tokens.get_by_user(*key)).token_data
+            token = transfer_client.parse_token(token_data)
+            if not await transfer_client.validate_token(token):
+                token = await transfer_client.refresh_token(token)
+                token_data = token.model_dump_json()
+                await uow.source_tokens.update_by_user(*key, SourceTokenUpdate(token_data=token_data))
+                await uow.commit()
+        finally:
+            # Lock lives until the end of transaction, so transaction is ended in every branch to release it
+            await uow.rollback()
+
+    new_token_data = token.model_dump_json()
+    if new_token_data != token_data:
+        await uow.source_tokens.update_by_user(*key, SourceTokenUpdate(token_data=new_token_data))
+        await uow.commit()
+    _tokens.set(key, new_token_data)
 
     return token
+
+
+async def search_for_tracks(
+        transfer_client: ITransferClient,
+        token: TToken,
+        tracks: list[Track],
+        match_cache: ITrackMatchCache | None = None,
+        resolved: dict[str, MatchResult] | None = None,
+) -> list[MatchResult]:
+    """
+    Search tracks in destination source by batch search of transfer_client. Each distinct track is searched once:
+    results are taken from resolved ones of the same transfer, then from cache, then from searches of the same tracks
+    running for other transfers. New results, except failed, are added to resolved.
+    Result keeps order of passed tracks
+    """
+    resolved = {} if resolved is None else resolved
+    destination = TransferSource(transfer_client.SOURCE)
+    query_keys = [TrackMatch.make_query_key(track.name, track.artist_name) for track in tracks]
+    # Distinct tracks, which aren't resolved yet, in order of their first appearance
+    unknown = {key: track for key, track in zip(query_keys, tracks, strict=True) if key not in resolved}
+
+    cached = await match_cache.get_many(destination.value, list(unknown)) if match_cache and unknown else {}
+    for query_key, match in cached.items():
+        status = MatchStatus.matched if match.destination_id else MatchStatus.not_found
+        resolved[query_key] = MatchResult(index=0, status=status, destination_id=match.destination_id)
+
+    found = await _search_coalesced(transfer_client, token, {
+        key: track for key, track in unknown.items() if key not in cached
+    })
+    new_matches: list[TrackMatch] = []
+    for query_key, result in found.items():
+        track = unknown[query_key]
+        if result.status != MatchStatus.matched:
+            logger.warning(f"Track {track.name} - {track.artist_name} not found in {transfer_client.SOURCE}: "
+                           f"{result.error}")
+        # Only definite "not found" is cached, other errors may be temporary
+        if result.status != MatchStatus.failed:
+            resolved[query_key] = result
+            new_matches.append(TrackMatch(
+                destination=destination, query_key=query_key, destination_id=result.destination_id))
+    if match_cache is not None and new_matches:
+        await match_cache.set_many(new_matches)
+
+    chunk_results = resolved | found
+    searched_keys = set(found)
+    results = []
+    for index, query_key in enumerate(query_keys):
+        update = {"index": index}
+        if query_key in searched_keys:
+            searched_keys.remove(query_key)
+        else:
+            # Duplicate or taken from cache, no request was made for this track
+            update["latency_ms"] = None
+        results.append(chunk_results[query_key].model_copy(update=update))
+    return results
+
+
+async def _search_coalesced(
+        transfer_client: ITransferClient,
+        token: TToken,
+        tracks: dict[str, Track],
+) -> dict[str, MatchResult]:
+    """
+    Search tracks by query keys. Searches of the same keys in the same destination, which are already running
+    for other transfers, are awaited instead of repeated
+    """
+    destination = transfer_client.SOURCE
+    joined = {key: _searches[(destination, key)] for key in tracks if (destination, key) in _searches}
+    own = [key for key in tracks if key not in joined]
+    loop = asyncio.get_running_loop()
+    futures = {key: loop.create_future() for key in own}
+    _searches.update({(destination, key): future for key, future in futures.items()})
+    if joined:
+        metrics.inc("track_search_coalesced_total", len(joined), destination=destination)
+
+    results: dict[str, MatchResult] = {}
+    try:
+        async for result in transfer_client.search_tracks(token, [tracks[key] for key in own]):
+            key = own[result.index]
+            results[key] = result
+            futures[key].set_result(result)
+    finally:
+        for key, future in futures.items():
+            # Search is interrupted, for example by expired token of this transfer. Waiters search by themselves
+            if not future.done():
+                future.set_result(None)
+            _searches.pop((destination, key), None)
+
+    for key, future in joined.items():
+        if (result := await asyncio.shield(future)) is not None:
+            results[key] = result
+    if retry := [key for key in joined if key not in results]:
+        async for result in transfer_client.search_tracks(token, [tracks[key] for key in retry]):
+            results[retry[result.index]] = result
+    return results
+
+
+async def prepend_page(page: TracksPage, pages: AsyncIterator[TracksPage]) -> AsyncIterator[TracksPage]:
+    yield page
+    async for page in pages:
+        yield page
+
+
+async def exclude_tracks(pages: AsyncIterator[TracksPage], source_ids: set[str]) -> AsyncIterator[TracksPage]:
+    """Total of pages is reduced by excluded tracks seen so far, so it is exact after the last page"""
+    excluded_count = 0
+    async for page in pages:
+        tracks = [track for track in page.tracks if track.source_id not in source_ids]
+        excluded_count += len(page.tracks) - len(tracks)
+        if tracks:
+            total = page.total - excluded_count if page.total is not None else None
+            yield TracksPage(tracks=tracks, total=total)
+
+
+async def search_and_add_tracks(
+        transfer_client: ITransferClient,
+        token: TToken,
+        playlist_id: str,
+        pages: AsyncIterator[TracksPage],
+        match_cache: ITrackMatchCache | None = None,
+        on_searched: Callable[[list[Track], list[MatchResult], int | None], Awaitable[None]] | None = None,
+        on_added: Callable[[int], Awaitable[None]] | None = None,
+        start_offset: int = 0,
+        queue_size: int = settings.TRANSFER_PIPELINE_QUEUE_SIZE,
+) -> None:
+    """
+    Run fetch, search and add stages concurrently, connected by queues of queue_size chunks.
+    Fetched tracks are searched by chunks of transfer_client.ADD_TRACKS_CHUNK_SIZE and found ones are added
+    to playlist in source order. First start_offset source tracks are skipped.
+    on_searched is awaited after each chunk search with its tracks, results and total of source reported by the last
+    fetched page, None if source doesn't report it.
+    on_added is awaited after each chunk is added with count of source tracks, which are handled completely
+    """
+    chunk_size = transfer_client.ADD_TRACKS_CHUNK_SIZE
+    tracks_queue: asyncio.Queue[list[Track] | None] = asyncio.Queue(queue_size)
+    found_queue: asyncio.Queue[tuple[list[str], int] | None] = asyncio.Queue(queue_size)
+    # Results of distinct tracks of this transfer, so repeated tracks aren't searched again
+    resolved: dict[str, MatchResult] = {}
+    fetched_count = 0
+    added_count = 0
+    total: int | None = None
+    duplicates_count = 0
+
+    async def fetch():
+        nonlocal fetched_count, total
+        chunk: list[Track] = []
+        async for page in pages:
+            skip = max(start_offset - fetched_count, 0)
+            fetched_count += len(page.tracks)
+            total = page.total
+            chunk += page.tracks[skip:]
+            while len(chunk) >= chunk_size:
+                await tracks_queue.put(chunk[:chunk_size])
+                chunk = chunk[chunk_size:]
+        if chunk:
+            await tracks_queue.put(chunk)
+        await tracks_queue.put(None)
+
+    async def search():
+        nonlocal duplicates_count
+        source_offset = start_offset
+        seen_keys: set[str] = set()
+        while (chunk := await tracks_queue.get()) is not None:
+            for track in chunk:
+                query_key = TrackMatch.make_query_key(track.name, track.artist_name)
+                duplicates_count += query_key in seen_keys
+                seen_keys.add(query_key)
+            search_results = await search_for_tracks(transfer_client, token, chunk, match_cache, resolved)
+            if on_searched is not None:
+                await on_searched(chunk, search_results, total)
+            tracks_ids = [result.destination_id for result in search_results if result.destination_id is not None]
+            logger.debug(f"Found {len(tracks_ids)} of {len(chunk)} tracks in {transfer_client.SOURCE}")
+            source_offset += len(chunk)
+            await found_queue.put((tracks_ids, source_offset))
+        await found_queue.put(None)
+
+    async def add():
+        nonlocal added_count
+        while (item := await found_queue.get()) is not None:
+            tracks_ids, source_offset = item
+            if tracks_ids:
+                await transfer_client.add_tracks_to_playlist(token, playlist_id, *tracks_ids)
+                added_count += len(tracks_ids)
+            if on_added is not None:
+                await on_added(source_offset)
+
+    # Failure of any stage cancels the others
+    try:
+        async with asyncio.TaskGroup() as group:
+            group.create_task(fetch())
+            group.create_task(search())
+            group.create_task(add())
+    except ExceptionGroup as e:
+        # Callers handle errors of pipeline by type, the rest of simultaneous errors are kept in traceback
+        if len(e.exceptions) == 1:
+            raise e.exceptions[0] from None
+        raise e.exceptions[0] from e
+
+    searched_count = fetched_count - start_offset
+    metrics.inc("track_search_tracks_total", searched_count, destination=transfer_client.SOURCE)
+    metrics.inc("track_search_duplicates_total", duplicates_count, destination=transfer_client.SOURCE)
+    dedup_ratio = duplicates_count / searched_count if searched_count else 0.0
+    logger.info(f"Added {added_count} of {searched_count} tracks, dedup ratio {dedup_ratio:.2f}")
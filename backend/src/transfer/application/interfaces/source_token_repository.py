@@ -13,3 +13,7 @@ class ISourceTokenRepository(abc.ABC):
     @abc.abstractmethod
     async def update_by_user(self, user_id: str, app_bundle: str, source: str,
                              data: SourceTokenUpdate) -> SourceToken: ...
+
+    @abc.abstractmethod
+    async def lock_by_user(self, user_id: str, app_bundle: str, source: str) -> None:
+        """Lock user token until the end of transaction"""
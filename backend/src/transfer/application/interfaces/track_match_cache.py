@@ -0,0 +1,12 @@
+import abc
+
+from src.transfer.domain.entities import TrackMatch
+
+
+class ITrackMatchCache(abc.ABC):
+    @abc.abstractmethod
+    async def get_many(self, destination: str, query_keys: list[str]) -> dict[str, TrackMatch]:
+        """Return not expired matches by query key. Missing keys are absent in result"""
+
+    @abc.abstractmethod
+    async def set_many(self, matches: list[TrackMatch]) -> None: ...
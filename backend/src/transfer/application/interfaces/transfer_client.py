@@ -1,7 +1,12 @@
 import abc
-from typing import Generic, TypeVar
+import asyncio
+import time
+from typing import AsyncIterator, Generic, TypeVar
 
-from src.integration.domain.entities import Album, Playlist, Track
+from src.integration.domain.entities import Album, Track, Playlist, PlaylistTracksAddResult, MatchResult, MatchStatus, \
+    TracksPage
+from src.integration.domain.exceptions import ExternalApiError, ExternalApiUnauthorizedError, \
+    ExternalApiQuotaExceededError, ExternalApiEmptyResponseError
 
 TAuthData = TypeVar("TAuthData")
 TToken = TypeVar("TToken")
@@ -10,6 +15,8 @@ TToken = TypeVar("TToken")
 class ITransferClient(abc.ABC, Generic[TAuthData, TToken]):
     API_URL: str
     SOURCE: str
+    SEARCH_CONCURRENCY: int = 1
+    ADD_TRACKS_CHUNK_SIZE: int = 100
 
     @abc.abstractmethod
     async def get_user_playlists(self, token: TToken) -> list[Playlist]: ...
@@ -17,12 +24,38 @@ class ITransferClient(abc.ABC, Generic[TAuthData, TToken]):
     @abc.abstractmethod
     async def get_user_albums(self, token: TToken) -> list[Album]: ...
 
+    @abc.abstractmethod
+    async def get_album(self, token: TToken, album_id: str) -> Album: ...
+
+    async def get_albums(self, token: TToken, *album_ids: str) -> list[Album]:
+        """Get albums in passed order, not found ones are skipped. By default albums are requested one by one"""
+        albums = await asyncio.gather(*(self.get_album(token, album_id) for album_id in album_ids),
+                                      return_exceptions=True)
+        for album in albums:
+            if isinstance(album, BaseException) and not isinstance(album, ExternalApiEmptyResponseError):
+                raise album
+        return [album for album in albums if isinstance(album, Album)]
+
     @abc.abstractmethod
     async def get_user_playlist_tracks(self, token: TToken, playlist_id: str) -> list[Track]: ...
 
     @abc.abstractmethod
-    async def get_user_favorites_tracks(self, token: TToken, total=None, offset=0, count=50) -> list[Track]:
-        """Recursively gets user liked tracks"""
+    async def get_user_favorites_tracks(self, token: TToken) -> list[Track]:
+        """Get all user liked tracks"""
+
+    async def get_playlist_snapshot_id(self, token: TToken, playlist_id: str) -> str | None:  # noqa: ARG002
+        """Version of playlist, which changes with its tracks. None if source doesn't support it"""
+        return None
+
+    async def iter_user_playlist_tracks(self, token: TToken, playlist_id: str) -> AsyncIterator[TracksPage]:
+        """Yield playlist tracks by pages in playlist order. By default all tracks are loaded at once"""
+        tracks = await self.get_user_playlist_tracks(token, playlist_id)
+        yield TracksPage(tracks=tracks, total=len(tracks))
+
+    async def iter_user_favorites_tracks(self, token: TToken) -> AsyncIterator[TracksPage]:
+        """Yield user liked tracks by pages. By default all tracks are loaded at once"""
+        tracks = await self.get_user_favorites_tracks(token)
+        yield TracksPage(tracks=tracks, total=len(tracks))
 
     @abc.abstractmethod
     async def create_user_playlist(self, token: TToken, name: str) -> Playlist: ...
@@ -31,10 +64,65 @@ class ITransferClient(abc.ABC, Generic[TAuthData, TToken]):
     async def add_user_album(self, token: TToken, album_name: str, artist_name: str) -> None: ...
 
     @abc.abstractmethod
-    async def add_tracks_to_playlist(self, token: TToken, playlist_id: str, *track_ids: str) -> None: ...
+    async def add_tracks_to_playlist(
+            self, token: TToken, playlist_id: str, *track_ids: str
+    ) -> list[PlaylistTracksAddResult]:
+        """Append tracks to the end of playlist in passed order. Return result for each sent chunk"""
+
+    @abc.abstractmethod
+    async def search_for_track(
+            self, token: TToken, track: str, artist: str, duration_ms: int | None = None, isrc: str | None = None
+    ) -> str:
+        """
+        Return id of the most similar found track. Raise ExternalApiEmptyResponseError, if none is similar enough.
+        Sources with isrc search look up exact recording first
+        """
+
+    async def search_tracks(self, token: TToken, tracks: list[Track]) -> AsyncIterator[MatchResult]:
+        """
+        Search batch of tracks, yield results as they are ready, not in order of tracks.
+        Failure of one search is returned in its result, unauthorized and quota errors stop the batch.
+        By default tracks are searched one by one, SEARCH_CONCURRENCY at a time
+        """
+        semaphore = asyncio.Semaphore(self.SEARCH_CONCURRENCY)
+
+        async def search(index: int, track: Track) -> MatchResult:
+            async with semaphore:
+                started_at = time.perf_counter()
+                try:
+                    destination_id = await self.search_for_track(
+                        token, track.name, track.artist_name, track.duration_ms, track.isrc)
+                    status, error = MatchStatus.matched, None
+                except (ExternalApiUnauthorizedError, ExternalApiQuotaExceededError):
+                    raise
+                except ExternalApiEmptyResponseError as e:
+                    destination_id, status, error = None, MatchStatus.not_found, e.detail
+                except ExternalApiError as e:
+                    destination_id, status, error = None, MatchStatus.failed, e.detail
+                latency_ms = int((time.perf_counter() - started_at) * 1000)
+            return MatchResult(index=index, status=status, destination_id=destination_id, latency_ms=latency_ms,
+                               error=error)
+
+        tasks = [asyncio.create_task(search(index, track)) for index, track in enumerate(tracks)]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
 
     @abc.abstractmethod
-    async def search_for_track(self, token: TToken, track: str, artist: str) -> str: ...
+    def parse_token(self, token_raw: str) -> TToken: ...
 
     @abc.abstractmethod
-    async def parse_and_validate_token(self, token_raw: str) -> TToken: ...
+    async def validate_token(self, token: TToken) -> bool:
+        """Return False, if token is expired or expires soon and must be refreshed"""
+
+    @abc.abstractmethod
+    async def refresh_token(self, token: TToken) -> TToken: ...
+
+    async def parse_and_validate_token(self, token_raw: str) -> TToken:
+        token = self.parse_token(token_raw)
+        if not await self.validate_token(token):
+            token = await self.refresh_token(token)
+        return token
@@ -0,0 +1,14 @@
+import abc
+from typing import AsyncContextManager
+from uuid import UUID
+
+
+class ITransferSubscription(abc.ABC):
+    @abc.abstractmethod
+    async def wait(self, timeout: float) -> bool:
+        """Wait for transfer change since previous wait. Return False on timeout"""
+
+
+class ITransferEvents(abc.ABC):
+    @abc.abstractmethod
+    def subscribe(self, transfer_id: UUID) -> AsyncContextManager[ITransferSubscription]: ...
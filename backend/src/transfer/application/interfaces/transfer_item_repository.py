@@ -0,0 +1,22 @@
+import abc
+from uuid import UUID
+
+from src.transfer.domain.entities import TransferItemCreate, TransferItemStatus
+
+
+class ITransferItemRepository(abc.ABC):
+    @abc.abstractmethod
+    async def create_many(self, items: list[TransferItemCreate]) -> None: ...
+
+    @abc.abstractmethod
+    async def delete_from_position(self, transfer_id: UUID, position: int) -> None: ...
+
+    @abc.abstractmethod
+    async def get_handled_source_ids(self, to_source: str, destination_playlist_id: str) -> set[str]:
+        """
+        Source tracks, which were added or not found by all transfers to destination playlist.
+        Only items before checkpoint of their transfer are taken, the rest may be not added
+        """
+
+    @abc.abstractmethod
+    async def count_by_status(self, transfer_id: UUID) -> dict[TransferItemStatus, int]: ...
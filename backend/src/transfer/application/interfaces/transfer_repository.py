@@ -1,15 +1,58 @@
 import abc
+import datetime as dt
 from uuid import UUID
 
-from src.transfer.domain.entities import Transfer, TransferCreate, TransferUpdate
+from src.transfer.domain.entities import Transfer, TransferCreate, TransferKind, TransferProgressUpdate, TransferUpdate
 
 
 class ITransferRepository(abc.ABC):
     @abc.abstractmethod
     async def get_by_pk(self, pk: UUID) -> Transfer: ...
 
+    @abc.abstractmethod
+    async def get_many(self, pks: list[UUID]) -> list[Transfer]: ...
+
+    @abc.abstractmethod
+    async def list_by_user(
+            self, user_id: str, app_bundle: str, limit: int, after: tuple[dt.datetime, UUID] | None = None
+    ) -> list[Transfer]:
+        """Newest transfers first. after is (created_at, id) of the last transfer of previous page"""
+
+    @abc.abstractmethod
+    async def get_last_finished_by_source_playlist(
+            self, user_id: str, app_bundle: str, from_source: str, to_source: str, source_playlist_id: str
+    ) -> Transfer | None: ...
+
     @abc.abstractmethod
     async def create(self, transfer_data: TransferCreate) -> Transfer: ...
 
     @abc.abstractmethod
     async def update_by_pk(self, pk: UUID, transfer_data: TransferUpdate) -> Transfer: ...
+
+    @abc.abstractmethod
+    async def update_progress(self, pk: UUID, progress: TransferProgressUpdate, worker_id: str | None = None) -> bool:
+        """Return False, if worker_id is passed and transfer is not owned by this worker anymore"""
+
+    @abc.abstractmethod
+    async def claim_next(
+            self, worker_id: str, kinds: list[TransferKind], destination_limits: dict[str, int]
+    ) -> Transfer | None:
+        """
+        Mark queued transfer of one of kinds as started by worker. Concurrent workers never claim the same transfer.
+        Transfers of users with less started transfers go first, then older ones.
+        Destinations with destination_limits started transfers are skipped
+        """
+
+    @abc.abstractmethod
+    async def count_queued(self) -> dict[TransferKind | None, int]: ...
+
+    @abc.abstractmethod
+    async def heartbeat(self, pk: UUID, worker_id: str) -> bool:
+        """Return False, if transfer is not started by this worker anymore"""
+
+    @abc.abstractmethod
+    async def requeue_stale(self, stale_timeout: float, max_attempts: int) -> int:
+        """
+        Return started transfers without heartbeat for stale_timeout seconds to queue,
+        or fail them after max_attempts. Return count of affected transfers
+        """
@@ -1,16 +1,26 @@
 import abc
 
 from src.transfer.application.interfaces.source_token_repository import ISourceTokenRepository
+from src.transfer.application.interfaces.transfer_item_repository import ITransferItemRepository
 from src.transfer.application.interfaces.transfer_repository import ITransferRepository
 
 
 class ITransferUnitOfWork(abc.ABC):
     transfers: ITransferRepository
     source_tokens: ISourceTokenRepository
+    transfer_items: ITransferItemRepository
 
     async def commit(self):
         await self._commit()
 
+    async def rollback(self):
+        await self._rollback()
+
+    @abc.abstractmethod
+    def fork(self) -> "ITransferUnitOfWork":
+        """New unit of work with own transaction, which isn't affected by state or cancellation of this one"""
+        pass
+
     @abc.abstractmethod
     async def _rollback(self):
         pass
@@ -0,0 +1,69 @@
+import asyncio
+
+from src.integration.domain.entities import Track, MatchResult, MatchStatus
+from src.transfer.application.interfaces.unit_of_work import ITransferUnitOfWork
+from src.transfer.domain.entities import Transfer, TransferItemCreate, TransferItemStatus, TransferProgressUpdate
+from src.transfer.domain.exceptions import TransferOwnershipLostError
+
+
+class TransferProgressRecorder:
+    """
+    Save search results of transfer tracks and checkpoint of added ones.
+    Each chunk is saved by one batch insert and one counters update
+    """
+
+    def __init__(self, uow: ITransferUnitOfWork, transfer: Transfer) -> None:
+        self.uow = uow
+        self.transfer = transfer
+        self._position = transfer.checkpoint_offset
+        # Pipeline stages report concurrently, but session can't be used concurrently
+        self._lock = asyncio.Lock()
+
+    async def restore(self) -> None:
+        """Drop results after checkpoint, they are searched again on resume"""
+        async with self._lock:
+            await self.uow.transfer_items.delete_from_position(self.transfer.id, self.transfer.checkpoint_offset)
+            counts = await self.uow.transfer_items.count_by_status(self.transfer.id)
+            matched = counts.get(TransferItemStatus.matched, 0)
+            processed = sum(counts.values())
+            # Counters are set by difference with loaded ones, so write is guarded by ownership like others
+            await self._update_progress(TransferProgressUpdate(
+                processed=processed - self.transfer.processed,
+                matched=matched - self.transfer.matched,
+                failed=processed - matched - self.transfer.failed,
+            ))
+            await self.uow.commit()
+
+    async def on_searched(self, tracks: list[Track], results: list[MatchResult], total: int | None) -> None:
+        items = [
+            TransferItemCreate(
+                transfer_id=self.transfer.id,
+                position=self._position + i,
+                source_id=track.source_id,
+                name=track.name,
+                artist_name=track.artist_name,
+                destination_id=result.destination_id,
+                status=TransferItemStatus(result.status.value),
+                latency_ms=result.latency_ms,
+            )
+            for i, (track, result) in enumerate(zip(tracks, results, strict=True))
+        ]
+        self._position += len(items)
+        matched = sum(1 for result in results if result.status == MatchStatus.matched)
+        progress = TransferProgressUpdate(
+            processed=len(items), total=total, matched=matched, failed=len(items) - matched
+        )
+
+        async with self._lock:
+            await self.uow.transfer_items.create_many(items)
+            await self._update_progress(progress)
+            await self.uow.commit()
+
+    async def on_added(self, source_offset: int) -> None:
+        async with self._lock:
+            await self._update_progress(TransferProgressUpdate(checkpoint_offset=source_offset))
+            await self.uow.commit()
+
+    async def _update_progress(self, progress: TransferProgressUpdate) -> None:
+        if not await self.uow.transfers.update_progress(self.transfer.id, progress, self.transfer.worker_id):
+            raise TransferOwnershipLostError(f"Transfer {self.transfer.id} is owned by another worker")
@@ -0,0 +1,184 @@
+import asyncio
+from typing import Callable
+
+from loguru import logger
+from pydantic import BaseModel
+
+from src.core.metrics import metrics
+from src.transfer.application.interfaces.track_match_cache import ITrackMatchCache
+from src.transfer.application.interfaces.transfer_client import ITransferClient
+from src.transfer.application.interfaces.unit_of_work import ITransferUnitOfWork
+from src.transfer.application.use_cases.run_album_transfer import RunAlbumTransferUseCase
+from src.transfer.application.use_cases.run_favorite_transfer import RunFavoriteTransferUseCase
+from src.transfer.application.use_cases.run_playlist_transfer import RunPlaylistTransferUseCase
+from src.transfer.domain.dtos import TransferAlbumCreateDTO, TransferFavoriteCreateDTO, TransferPlaylistCreateDTO
+from src.transfer.domain.entities import Transfer, TransferKind, TransferSource, TransferStatus, TransferUpdate
+from src.transfer.domain.exceptions import TransferOwnershipLostError
+
+
+class TransferLane(BaseModel):
+    """Transfers of lane kinds run in own concurrency slots, so long jobs don't block short ones"""
+    name: str
+    kinds: list[TransferKind]
+    concurrency: int
+
+
+class TransferWorker:
+    """Claim queued transfers from database and run them, until stopped"""
+
+    def __init__(
+            self,
+            worker_id: str,
+            uow_factory: Callable[[], ITransferUnitOfWork],
+            client_factory: Callable[[TransferSource], ITransferClient],
+            lanes: list[TransferLane],
+            match_cache: ITrackMatchCache | None = None,
+            destination_limits: dict[str, int] | None = None,
+            poll_interval: float = 1.0,
+            heartbeat_interval: float = 10.0,
+            stale_timeout: float = 60.0,
+            max_attempts: int = 3,
+    ) -> None:
+        self.worker_id = worker_id
+        self.uow_factory = uow_factory
+        self.client_factory = client_factory
+        self.lanes = lanes
+        self.match_cache = match_cache
+        self.destination_limits = destination_limits or {}
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.stale_timeout = stale_timeout
+        self.max_attempts = max_attempts
+        self._stopping = asyncio.Event()
+        self._tasks: set[asyncio.Task] = set()
+
+    def stop(self) -> None:
+        """Stop claiming new transfers. Already started ones are finished"""
+        self._stopping.set()
+
+    async def run(self) -> None:
+        logger.info(f"Transfer worker {self.worker_id} started")
+        await asyncio.gather(self._maintain(), *(self._run_lane(lane) for lane in self.lanes))
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        logger.info(f"Transfer worker {self.worker_id} stopped")
+
+    async def _maintain(self) -> None:
+        while not self._stopping.is_set():
+            await self._requeue_stale()
+            await self._update_queue_metrics()
+            await self._sleep(self.stale_timeout / 2)
+
+    async def _run_lane(self, lane: TransferLane) -> None:
+        slots = asyncio.Semaphore(lane.concurrency)
+        while not self._stopping.is_set():
+            await slots.acquire()
+            # Stop could be requested while all slots were busy
+            if self._stopping.is_set():
+                slots.release()
+                break
+            transfer = await self._claim(lane)
+            if transfer is None:
+                slots.release()
+                await self._sleep(self.poll_interval)
+                continue
+
+            task = asyncio.create_task(self._process(transfer))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            task.add_done_callback(lambda _: slots.release())
+
+    async def _sleep(self, seconds: float) -> None:
+        try:
+            await asyncio.wait_for(self._stopping.wait(), seconds)
+        except TimeoutError:
+            pass
+
+    async def _claim(self, lane: TransferLane) -> Transfer | None:
+        try:
+            async with self.uow_factory() as uow:
+                transfer = await uow.transfers.claim_next(self.worker_id, lane.kinds, self.destination_limits)
+                await uow.commit()
+        except Exception as e:
+            logger.exception(f"Failed to claim transfer: {e}")
+            return None
+        if transfer is not None and transfer.created_at and transfer.heartbeat_at:
+            metrics.inc("transfer_claimed_total", lane=lane.name)
+            wait = (transfer.heartbeat_at - transfer.created_at).total_seconds()
+            metrics.inc("transfer_wait_seconds_total", wait, lane=lane.name)
+            metrics.set("transfer_last_wait_seconds", wait, lane=lane.name)
+        return transfer
+
+    async def _update_queue_metrics(self) -> None:
+        try:
+            async with self.uow_factory() as uow:
+                queued = await uow.transfers.count_queued()
+        except Exception as e:
+            logger.warning(f"Failed to count queued transfers: {e}")
+            return
+        for lane in self.lanes:
+            metrics.set("transfer_queue_depth", sum(queued.get(kind, 0) for kind in lane.kinds), lane=lane.name)
+
+    async def _requeue_stale(self) -> None:
+        try:
+            async with self.uow_factory() as uow:
+                count = await uow.transfers.requeue_stale(self.stale_timeout, self.max_attempts)
+                await uow.commit()
+        except Exception as e:
+            logger.exception(f"Failed to requeue stale transfers: {e}")
+            return
+        if count:
+            logger.warning(f"Recovered {count} stale transfers")
+
+    async def _heartbeat(self, transfer: Transfer, execution: asyncio.Task, lost: asyncio.Event) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                async with self.uow_factory() as uow:
+                    owned = await uow.transfers.heartbeat(transfer.id, self.worker_id)
+                    await uow.commit()
+            except Exception as e:
+                logger.warning(f"Failed to send heartbeat of transfer {transfer.id}: {e}")
+                continue
+            if not owned:
+                # Transfer was requeued as stale, so running it further would duplicate work of its new owner
+                lost.set()
+                execution.cancel()
+                return
+
+    async def _process(self, transfer: Transfer) -> None:
+        logger.info(f"Transfer {transfer.id} claimed by {self.worker_id}, attempt {transfer.attempts}")
+        lost = asyncio.Event()
+        execution = asyncio.create_task(self._execute(transfer))
+        heartbeat = asyncio.create_task(self._heartbeat(transfer, execution, lost))
+        try:
+            await execution
+        except asyncio.CancelledError:
+            if not lost.is_set():
+                raise
+            logger.warning(f"Transfer {transfer.id} stopped, it is not owned by {self.worker_id} anymore")
+        except TransferOwnershipLostError as e:
+            logger.warning(f"Transfer {transfer.id} stopped: {e}")
+        except Exception as e:
+            logger.exception(f"Transfer {transfer.id} failed: {e}")
+        finally:
+            heartbeat.cancel()
+
+    async def _execute(self, transfer: Transfer) -> None:
+        from_client = self.client_factory(transfer.from_source)
+        to_client = self.client_factory(transfer.to_source)
+        uow = self.uow_factory()
+        if transfer.kind == TransferKind.playlist:
+            use_case = RunPlaylistTransferUseCase(from_client, to_client, uow, self.match_cache)
+            await use_case.execute(transfer.id, TransferPlaylistCreateDTO.model_validate_json(transfer.payload))
+        elif transfer.kind == TransferKind.favorite:
+            use_case = RunFavoriteTransferUseCase(from_client, to_client, uow, self.match_cache)
+            await use_case.execute(transfer.id, TransferFavoriteCreateDTO.model_validate_json(transfer.payload))
+        elif transfer.kind == TransferKind.album:
+            use_case = RunAlbumTransferUseCase(from_client, to_client, uow)
+            await use_case.execute(transfer.id, TransferAlbumCreateDTO.model_validate_json(transfer.payload))
+        else:
+            # Transfers enqueued before worker was introduced have no payload
+            async with uow:
+                await uow.transfers.update_by_pk(
+                    transfer.id, TransferUpdate(status=TransferStatus.failed, error="Unknown transfer kind"))
+                await uow.commit()
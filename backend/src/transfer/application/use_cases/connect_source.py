@@ -1,6 +1,7 @@
 import json
 from typing import Generic
 
+from src.transfer.application.integration_utils import forget_transfer_token
 from src.transfer.application.interfaces.transfer_client import (
     ITransferClient,
     TAuthData,
@@ -29,3 +30,4 @@ class ConnectSourceUseCase(Generic[TAuthData]):
         async with self.uow:
             await self.uow.source_tokens.create(command)
             await self.uow.commit()
+        forget_transfer_token(dto.user_id, dto.app_bundle, self.transfer_client.SOURCE)
@@ -1,6 +1,6 @@
 from src.transfer.application.interfaces.unit_of_work import ITransferUnitOfWork
 from src.transfer.domain.dtos import TransferAlbumCreateDTO, TransferPlaylistCreateDTO, TransferFavoriteCreateDTO
-from src.transfer.domain.entities import Transfer, TransferCreate
+from src.transfer.domain.entities import Transfer, TransferCreate, TransferKind
 
 
 class CreateTransferUseCase:
@@ -8,8 +8,24 @@ class CreateTransferUseCase:
         self.uow = uow
 
     async def execute(self, from_source: str, to_source: str, dto: TransferPlaylistCreateDTO | TransferAlbumCreateDTO | TransferFavoriteCreateDTO) -> Transfer:
-        command = TransferCreate(**dto.model_dump(), from_source=from_source, to_source=to_source)
+        """Enqueue transfer, it is run by transfer worker"""
+        command = TransferCreate(
+            **dto.model_dump(),
+            from_source=from_source,
+            to_source=to_source,
+            kind=self._get_kind(dto),
+            payload=dto.model_dump_json(),
+            source_playlist_id=dto.playlist_id if isinstance(dto, TransferPlaylistCreateDTO) else None,
+        )
         async with self.uow:
             model = await self.uow.transfers.create(command)
             await self.uow.commit()
         return model
+
+    @staticmethod
+    def _get_kind(dto: TransferPlaylistCreateDTO | TransferAlbumCreateDTO | TransferFavoriteCreateDTO) -> TransferKind:
+        if isinstance(dto, TransferPlaylistCreateDTO):
+            return TransferKind.playlist
+        if isinstance(dto, TransferAlbumCreateDTO):
+            return TransferKind.album
+        return TransferKind.favorite
@@ -0,0 +1,36 @@
+import base64
+import datetime as dt
+from uuid import UUID
+
+from fastapi import HTTPException
+
+from src.transfer.application.interfaces.unit_of_work import ITransferUnitOfWork
+from src.transfer.domain.dtos import TransferHistoryListDTO, TransferHistoryReadDTO, TransferReadDTO
+from src.transfer.domain.entities import Transfer
+
+
+class ListTransferHistoryUseCase:
+    def __init__(self, uow: ITransferUnitOfWork) -> None:
+        self.uow = uow
+
+    async def execute(self, dto: TransferHistoryListDTO) -> TransferHistoryReadDTO:
+        after = self._decode_cursor(dto.cursor) if dto.cursor else None
+        async with self.uow:
+            transfers = await self.uow.transfers.list_by_user(dto.user_id, dto.app_bundle, dto.limit, after)
+        next_cursor = self._encode_cursor(transfers[-1]) if len(transfers) == dto.limit else None
+        return TransferHistoryReadDTO(
+            items=[TransferReadDTO.model_validate(transfer.model_dump()) for transfer in transfers],
+            next_cursor=next_cursor,
+        )
+
+    @staticmethod
+    def _encode_cursor(transfer: Transfer) -> str:
+        return base64.urlsafe_b64encode(f"{transfer.created_at.isoformat()}|{transfer.id}".encode()).decode()
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> tuple[dt.datetime, UUID]:
+        try:
+            created_at, transfer_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+            return dt.datetime.fromisoformat(created_at), UUID(transfer_id)
+        except ValueError as e:
+            raise HTTPException(400, detail="Invalid cursor") from e
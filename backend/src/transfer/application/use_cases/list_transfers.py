@@ -0,0 +1,20 @@
+from uuid import UUID
+
+from src.transfer.application.interfaces.unit_of_work import ITransferUnitOfWork
+from src.transfer.domain.dtos import TransferReadDTO
+
+
+class ListTransfersUseCase:
+    def __init__(self, uow: ITransferUnitOfWork) -> None:
+        self.uow = uow
+
+    async def execute(self, transfer_ids: list[UUID]) -> list[TransferReadDTO]:
+        """Found transfers in order of passed ids, not existed ones are skipped"""
+        async with self.uow:
+            transfers = await self.uow.transfers.get_many(transfer_ids)
+        by_id = {transfer.id: transfer for transfer in transfers}
+        return [
+            TransferReadDTO.model_validate(by_id[transfer_id].model_dump())
+            for transfer_id in dict.fromkeys(transfer_ids)
+            if transfer_id in by_id
+        ]
@@ -0,0 +1,27 @@
+from uuid import UUID
+
+from fastapi import HTTPException
+
+from src.db.exceptions import DBModelNotFoundException
+from src.transfer.application.interfaces.unit_of_work import ITransferUnitOfWork
+from src.transfer.domain.dtos import TransferReadDTO
+from src.transfer.domain.entities import TransferStatus, TransferUpdate
+
+
+class ResumeTransferUseCase:
+    def __init__(self, uow: ITransferUnitOfWork) -> None:
+        self.uow = uow
+
+    async def execute(self, transfer_id: UUID) -> TransferReadDTO:
+        """Return failed transfer to queue, worker continues it from saved checkpoint"""
+        async with self.uow:
+            try:
+                transfer = await self.uow.transfers.get_by_pk(transfer_id)
+            except DBModelNotFoundException as e:
+                raise HTTPException(404) from e
+            if transfer.status != TransferStatus.failed:
+                raise HTTPException(409, detail="Only failed transfer can be resumed")
+            update = TransferUpdate(status=TransferStatus.queued, error=None, attempts=0)
+            transfer = await self.uow.transfers.update_by_pk(transfer_id, update)
+            await self.uow.commit()
+        return TransferReadDTO.model_validate(transfer.model_dump())
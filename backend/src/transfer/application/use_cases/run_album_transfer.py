@@ -42,12 +42,7 @@ class RunAlbumTransferUseCase:
         await self.uow.commit()
 
     async def get_album_to_transfer(self, dto: TransferAlbumCreateDTO) -> Album:
-        albums = await self.from_transfer_client.get_user_albums(self._from_token)
-        logger.debug(albums)
-        return [i for i in albums if i.source_id == dto.album_id][0]
-        return next(
-            filter(lambda i: i.source_id == dto.album_id, albums)
-        )
+        return await self.from_transfer_client.get_album(self._from_token, dto.album_id)
 
     async def transfer_album(self, album: Album):
         await self.to_transfer_client.add_user_album(self._to_token, album.name, album.artist_name)
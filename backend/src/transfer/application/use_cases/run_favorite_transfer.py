@@ -1,71 +1,98 @@
 import datetime as dt
+from typing import AsyncIterator
 from uuid import UUID
 
 from loguru import logger
 
-from src.integration.domain.entities import Playlist, Track
-from src.transfer.application.integration_utils import get_transfer_token
+from src.integration.domain.entities import Playlist, TracksPage
+from src.transfer.application.integration_utils import get_transfer_token, prepend_page, search_and_add_tracks
+from src.transfer.application.interfaces.track_match_cache import ITrackMatchCache
 from src.transfer.application.interfaces.transfer_client import ITransferClient, TToken
 from src.transfer.application.interfaces.unit_of_work import ITransferUnitOfWork
+from src.transfer.application.transfer_progress import TransferProgressRecorder
 from src.transfer.domain.dtos import TransferPlaylistCreateDTO, TransferFavoriteCreateDTO
-from src.transfer.domain.entities import TransferStatus, TransferUpdate
+from src.transfer.domain.entities import Transfer, TransferStatus, TransferUpdate
+from src.transfer.domain.exceptions import TransferOwnershipLostError
 
 
 class RunFavoriteTransferUseCase:
     def __init__(
-            self, from_transfer_client: ITransferClient, to_transfer_client: ITransferClient, uow: ITransferUnitOfWork
+            self,
+            from_transfer_client: ITransferClient,
+            to_transfer_client: ITransferClient,
+            uow: ITransferUnitOfWork,
+            match_cache: ITrackMatchCache | None = None,
     ) -> None:
         self.from_transfer_client = from_transfer_client
         self.to_transfer_client = to_transfer_client
         self.uow = uow
+        self.match_cache = match_cache
         self._from_token: TToken | None = None
         self._to_token: TToken | None = None
 
     async def execute(self, transfer_id: UUID, dto: TransferFavoriteCreateDTO) -> None:
         logger.info(f"Started transfer {transfer_id} {dto=}")
         async with self.uow:
+            transfer = await self.uow.transfers.get_by_pk(transfer_id)
             await self.set_transfer_status(transfer_id, TransferStatus.started)
-            playlist = await self._transfer(transfer_id, dto)
+            playlist = await self._transfer(transfer, dto)
             await self.set_transfer_status(transfer_id, TransferStatus.finished, result=playlist.model_dump_json())
             await self.uow.commit()
         logger.info(f"Finished transfer {transfer_id}")
 
-    async def _transfer(self, transfer_id, dto) -> Playlist:
+    async def _transfer(self, transfer: Transfer, dto) -> Playlist:
         try:
             await self.get_from_transfer_token(dto)
             await self.get_to_transfer_token(dto)
-            tracks = await self.get_tracks_to_transfer()
-            playlist = await self.transfer_tracks(tracks)
+            tracks = self.get_tracks_to_transfer()
+            playlist = await self.transfer_tracks(transfer, tracks)
+        except TransferOwnershipLostError:
+            # Transfer state belongs to the worker, which claimed it again
+            raise
         except Exception as e:
-            await self.set_transfer_status(transfer_id, TransferStatus.failed, error=str(e))
+            await self.set_transfer_status(transfer.id, TransferStatus.failed, error=str(e))
             raise e
         return playlist
 
     async def set_transfer_status(
             self, transfer_id: UUID, status: TransferStatus, error: str | None = None, result: str | None = None
     ):
-        await self.uow.transfers.update_by_pk(transfer_id, TransferUpdate(status=status, error=error, result=result))
+        update = TransferUpdate(status=status, error=error)
+        # Result of not finished transfer is playlist, which is kept for resume
+        if result is not None:
+            update.result = result
+        await self.uow.transfers.update_by_pk(transfer_id, update)
         await self.uow.commit()
 
-    async def get_tracks_to_transfer(self) -> list[Track]:
-        return await self.from_transfer_client.get_user_favorites_tracks(self._from_token)
+    def get_tracks_to_transfer(self) -> AsyncIterator[TracksPage]:
+        return self.from_transfer_client.iter_user_favorites_tracks(self._from_token)
 
-    async def search_for_tracks(self, tracks: list[Track]) -> list[str]:
-        ret = []
-        for track in tracks:
-            founded_track_id = await self.to_transfer_client.search_for_track(
-                self._to_token, track.name, track.artist_name
+    async def transfer_tracks(self, transfer: Transfer, tracks: AsyncIterator[TracksPage]) -> Playlist:
+        # First page is loaded before playlist creation, so empty or unavailable source fails earlier
+        first_page = await anext(tracks)
+        progress = TransferProgressRecorder(self.uow, transfer)
+        if transfer.destination_playlist_id is not None and transfer.result is not None:
+            # Resumed transfer continues from checkpoint in playlist created by previous attempt
+            playlist = Playlist.model_validate_json(transfer.result)
+            await progress.restore()
+        else:
+            playlist = await self.to_transfer_client.create_user_playlist(
+                self._to_token, "Favorites. Transferred " + dt.date.today().isoformat()
             )
-            ret.append(founded_track_id)
-        return ret
-
-    async def transfer_tracks(self, tracks: list[Track]) -> Playlist:
-        new_playlist = await self.to_transfer_client.create_user_playlist(
-            self._to_token, "Favorites. Transferred " + dt.date.today().isoformat()
+            update = TransferUpdate(destination_playlist_id=playlist.source_id, result=playlist.model_dump_json())
+            await self.uow.transfers.update_by_pk(transfer.id, update)
+            await self.uow.commit()
+        await search_and_add_tracks(
+            self.to_transfer_client,
+            self._to_token,
+            playlist.source_id,
+            prepend_page(first_page, tracks),
+            self.match_cache,
+            on_searched=progress.on_searched,
+            on_added=progress.on_added,
+            start_offset=transfer.checkpoint_offset,
         )
-        tracks_ids = await self.search_for_tracks(tracks)
-        await self.to_transfer_client.add_tracks_to_playlist(self._to_token, new_playlist.source_id, *tracks_ids)
-        return new_playlist
+        return playlist
 
     async def get_from_transfer_token(self, dto: TransferPlaylistCreateDTO) -> None:
         self._from_token = await get_transfer_token(self.uow, self.from_transfer_client, dto.user_id, dto.app_bundle)
@@ -1,71 +1,150 @@
 import datetime as dt
+from typing import AsyncIterator
 from uuid import UUID
 
 from loguru import logger
 
-from src.integration.domain.entities import Playlist, Track
-from src.transfer.application.integration_utils import get_transfer_token
+from src.integration.domain.entities import Playlist, TracksPage
+from src.transfer.application.integration_utils import exclude_tracks, get_transfer_token, prepend_page, \
+    search_and_add_tracks
+from src.transfer.application.interfaces.track_match_cache import ITrackMatchCache
 from src.transfer.application.interfaces.transfer_client import ITransferClient, TToken
 from src.transfer.application.interfaces.unit_of_work import ITransferUnitOfWork
+from src.transfer.application.transfer_progress import TransferProgressRecorder
 from src.transfer.domain.dtos import TransferPlaylistCreateDTO
-from src.transfer.domain.entities import TransferStatus, TransferUpdate
+from src.transfer.domain.entities import Transfer, TransferStatus, TransferUpdate
+from src.transfer.domain.exceptions import TransferOwnershipLostError
 
 
 class RunPlaylistTransferUseCase:
     def __init__(
-            self, from_transfer_client: ITransferClient, to_transfer_client: ITransferClient, uow: ITransferUnitOfWork
+            self,
+            from_transfer_client: ITransferClient,
+            to_transfer_client: ITransferClient,
+            uow: ITransferUnitOfWork,
+            match_cache: ITrackMatchCache | None = None,
     ) -> None:
         self.from_transfer_client = from_transfer_client
         self.to_transfer_client = to_transfer_client
         self.uow = uow
+        self.match_cache = match_cache
         self._from_token: TToken | None = None
         self._to_token: TToken | None = None
 
     async def execute(self, transfer_id: UUID, dto: TransferPlaylistCreateDTO) -> None:
         logger.info(f"Started transfer {transfer_id} {dto=}")
         async with self.uow:
+            transfer = await self.uow.transfers.get_by_pk(transfer_id)
             await self.set_transfer_status(transfer_id, TransferStatus.started)
-            playlist = await self._transfer(transfer_id, dto)
+            playlist = await self._transfer(transfer, dto)
             await self.set_transfer_status(transfer_id, TransferStatus.finished, result=playlist.model_dump_json())
             await self.uow.commit()
         logger.info(f"Finished transfer {transfer_id}")
 
-    async def _transfer(self, transfer_id, dto) -> Playlist:
+    async def _transfer(self, transfer: Transfer, dto) -> Playlist:
         try:
             await self.get_from_transfer_token(dto)
             await self.get_to_transfer_token(dto)
-            tracks = await self.get_tracks_to_transfer(dto)
-            playlist = await self.transfer_tracks(tracks)
+            transfer = await self.save_source_snapshot(transfer, dto)
+            if dto.sync:
+                transfer, unchanged_playlist = await self.prepare_sync(transfer)
+                if unchanged_playlist is not None:
+                    return unchanged_playlist
+            tracks = self.get_tracks_to_transfer(dto)
+            playlist = await self.transfer_tracks(transfer, tracks, sync=dto.sync)
+        except TransferOwnershipLostError:
+            # Transfer state belongs to the worker, which claimed it again
+            raise
         except Exception as e:
-            await self.set_transfer_status(transfer_id, TransferStatus.failed, error=str(e))
+            await self.set_transfer_status(transfer.id, TransferStatus.failed, error=str(e))
             raise e
         return playlist
 
     async def set_transfer_status(
             self, transfer_id: UUID, status: TransferStatus, error: str | None = None, result: str | None = None
     ):
-        await self.uow.transfers.update_by_pk(transfer_id, TransferUpdate(status=status, error=error, result=result))
+        update = TransferUpdate(status=status, error=error)
+        # Result of not finished transfer is playlist, which is kept for resume
+        if result is not None:
+            update.result = result
+        await self.uow.transfers.update_by_pk(transfer_id, update)
         await self.uow.commit()
 
-    async def get_tracks_to_transfer(self, dto: TransferPlaylistCreateDTO) -> list[Track]:
-        return await self.from_transfer_client.get_user_playlist_tracks(self._from_token, dto.playlist_id)
+    async def save_source_snapshot(self, transfer: Transfer, dto: TransferPlaylistCreateDTO) -> Transfer:
+        snapshot_id = await self.from_transfer_client.get_playlist_snapshot_id(self._from_token, dto.playlist_id)
+        if snapshot_id is None:
+            return transfer
+        await self.uow.transfers.update_by_pk(transfer.id, TransferUpdate(source_snapshot_id=snapshot_id))
+        await self.uow.commit()
+        return transfer.model_copy(update={"source_snapshot_id": snapshot_id})
+
+    async def prepare_sync(self, transfer: Transfer) -> tuple[Transfer, Playlist | None]:
+        """
+        Use destination playlist of the last finished transfer of the same source playlist.
+        Return its playlist as second value, if source playlist is not changed since then
+        """
+        if transfer.destination_playlist_id is not None:
+            return transfer, None
+        previous = await self.uow.transfers.get_last_finished_by_source_playlist(
+            transfer.user_id, transfer.app_bundle, transfer.from_source, transfer.to_source, transfer.source_playlist_id
+        )
+        if previous is None or previous.result is None:
+            return transfer, None
+
+        update = TransferUpdate(destination_playlist_id=previous.destination_playlist_id, result=previous.result)
+        await self.uow.transfers.update_by_pk(transfer.id, update)
+        await self.uow.commit()
+        if transfer.source_snapshot_id is not None and transfer.source_snapshot_id == previous.source_snapshot_id:
+            logger.info(f"Source playlist is not changed since transfer {previous.id}")
+            return transfer, Playlist.model_validate_json(previous.result)
+        return transfer.model_copy(update=update.model_dump(exclude_unset=True)), None
 
-    async def search_for_tracks(self, tracks: list[Track]) -> list[str]:
-        ret = []
-        for track in tracks:
-            founded_track_id = await self.to_transfer_client.search_for_track(
-                self._to_token, track.name, track.artist_name
+    def get_tracks_to_transfer(self, dto: TransferPlaylistCreateDTO) -> AsyncIterator[TracksPage]:
+        return self.from_transfer_client.iter_user_playlist_tracks(self._from_token, dto.playlist_id)
+
+    async def transfer_tracks(
+            self, transfer: Transfer, tracks: AsyncIterator[TracksPage], sync: bool = False
+    ) -> Playlist:
+        # First page is loaded before playlist creation, so empty or unavailable source fails earlier
+        first_page = await anext(tracks)
+        progress = TransferProgressRecorder(self.uow, transfer)
+        if transfer.destination_playlist_id is not None and transfer.result is not None:
+            # Resumed transfer continues from checkpoint in playlist created by previous attempt
+            playlist = Playlist.model_validate_json(transfer.result)
+            await progress.restore()
+        else:
+            playlist = await self.to_transfer_client.create_user_playlist(
+                self._to_token, "Transfered " + dt.date.today().isoformat()
             )
-            ret.append(founded_track_id)
-        return ret
+            update = TransferUpdate(destination_playlist_id=playlist.source_id, result=playlist.model_dump_json())
+            await self.uow.transfers.update_by_pk(transfer.id, update)
+            await self.uow.commit()
+
+        pages = prepend_page(first_page, tracks)
+        start_offset = transfer.checkpoint_offset
+        on_added = progress.on_added
+        if sync:
+            # Tracks handled by any transfer to this playlist are skipped instead of checkpoint offset
+            handled_ids = await self.uow.transfer_items.get_handled_source_ids(transfer.to_source, playlist.source_id)
+            pages = exclude_tracks(pages, handled_ids)
+            start_offset = 0
 
-    async def transfer_tracks(self, tracks: list[Track]) -> Playlist:
-        new_playlist = await self.to_transfer_client.create_user_playlist(
-            self._to_token, "Transfered " + dt.date.today().isoformat()
+            async def on_synced(source_offset: int) -> None:
+                # Tracks added before resume are excluded from pages, but are counted by checkpoint
+                await progress.on_added(transfer.checkpoint_offset + source_offset)
+
+            on_added = on_synced
+        await search_and_add_tracks(
+            self.to_transfer_client,
+            self._to_token,
+            playlist.source_id,
+            pages,
+            self.match_cache,
+            on_searched=progress.on_searched,
+            on_added=on_added,
+            start_offset=start_offset,
         )
-        tracks_ids = await self.search_for_tracks(tracks)
-        await self.to_transfer_client.add_tracks_to_playlist(self._to_token, new_playlist.source_id, *tracks_ids)
-        return new_playlist
+        return playlist
 
     async def get_from_transfer_token(self, dto: TransferPlaylistCreateDTO) -> None:
         self._from_token = await get_transfer_token(self.uow, self.from_transfer_client, dto.user_id, dto.app_bundle)
@@ -0,0 +1,38 @@
+from typing import AsyncIterator
+from uuid import UUID
+
+from src.transfer.application.interfaces.transfer_events import ITransferEvents
+from src.transfer.application.interfaces.unit_of_work import ITransferUnitOfWork
+from src.transfer.application.use_cases.get_transfer import GetTransferUseCase
+from src.transfer.domain.dtos import TransferReadDTO
+from src.transfer.domain.entities import TransferStatus
+
+
+class WatchTransferUseCase:
+    """Read transfer again only when it is changed, instead of polling database"""
+    FINAL_STATUSES = (TransferStatus.finished, TransferStatus.failed)
+
+    def __init__(self, uow: ITransferUnitOfWork, events: ITransferEvents) -> None:
+        self.uow = uow
+        self.events = events
+
+    async def wait(self, transfer_id: UUID, timeout: float) -> TransferReadDTO:
+        """Return transfer after its next change or timeout. Finished transfer is returned immediately"""
+        async with self.events.subscribe(transfer_id) as subscription:
+            transfer = await GetTransferUseCase(self.uow).execute(transfer_id)
+            if transfer.status in self.FINAL_STATUSES:
+                return transfer
+            if await subscription.wait(timeout):
+                transfer = await GetTransferUseCase(self.uow).execute(transfer_id)
+        return transfer
+
+    async def stream(self, transfer_id: UUID, keepalive_interval: float) -> AsyncIterator[str]:
+        """Yield server-sent events with transfer state on each change, until transfer is finished"""
+        async with self.events.subscribe(transfer_id) as subscription:
+            while True:
+                transfer = await GetTransferUseCase(self.uow).execute(transfer_id)
+                yield f"data: {transfer.model_dump_json()}\n\n"
+                if transfer.status in self.FINAL_STATUSES:
+                    return
+                while not await subscription.wait(keepalive_interval):
+                    yield ": keepalive\n\n"
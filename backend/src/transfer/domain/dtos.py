@@ -29,10 +29,21 @@ class UserAlbumListDTO(BaseModel):
     app_bundle: str
 
 
+class TransferHistoryListDTO(BaseModel):
+    user_id: str
+    app_bundle: str
+    limit: int = Field(default=20, ge=1, le=100)
+    cursor: str | None = Field(default=None, description="next_cursor from previous page")
+
+
 class TransferPlaylistCreateDTO(BaseModel):
     user_id: str
     app_bundle: str
     playlist_id: str
+    sync: bool = Field(
+        default=False,
+        description="Add only new tracks to destination playlist of the last finished transfer of this playlist",
+    )
 
 
 class TransferAlbumCreateDTO(BaseModel):
@@ -75,9 +86,19 @@ class TransferReadDTO(BaseModel):
     result: PlaylistReadDTO | None = None
     user_id: str
     app_bundle: str
+    processed: int = 0
+    total: int | None = None
+    """Count of source tracks to transfer, reported by source. None if source doesn't report it"""
+    matched: int = 0
+    failed: int = 0
 
     @field_validator("result", mode="before")
     def parse_json_result(cls, value: Any) -> PlaylistReadDTO:
         if not isinstance(value, str):
             return value
         return PlaylistReadDTO.model_validate_json(value)
+
+
+class TransferHistoryReadDTO(BaseModel):
+    items: list[TransferReadDTO]
+    next_cursor: str | None = None
@@ -1,8 +1,11 @@
+import datetime as dt
 from enum import Enum
 from uuid import UUID
 
 from pydantic import BaseModel
 
+from src.integration.domain.matching import normalize_artist, normalize_title
+
 
 class TransferSource(str, Enum):
     SPOTIFY = "spotify"
@@ -16,6 +19,12 @@ class TransferStatus(str, Enum):
     failed = 'failed'
 
 
+class TransferKind(str, Enum):
+    playlist = 'playlist'
+    album = 'album'
+    favorite = 'favorite'
+
+
 class Transfer(BaseModel):
     id: UUID
     status: TransferStatus
@@ -23,6 +32,26 @@ class Transfer(BaseModel):
     error: str | None = None
     user_id: str
     app_bundle: str
+    from_source: TransferSource
+    to_source: TransferSource
+    kind: TransferKind | None = None
+    payload: str | None = None
+    """Json of create dto, which is passed to run use case by worker"""
+    attempts: int = 0
+    created_at: dt.datetime | None = None
+    worker_id: str | None = None
+    heartbeat_at: dt.datetime | None = None
+    processed: int = 0
+    total: int | None = None
+    """Count of source tracks to transfer. None if source doesn't report it"""
+    matched: int = 0
+    failed: int = 0
+    destination_playlist_id: str | None = None
+    checkpoint_offset: int = 0
+    """Count of source tracks, which are searched and added to destination playlist"""
+    source_playlist_id: str | None = None
+    source_snapshot_id: str | None = None
+    """Version of source playlist at the time of transfer"""
 
 
 class TransferCreate(BaseModel):
@@ -30,6 +59,9 @@ class TransferCreate(BaseModel):
     app_bundle: str
     from_source: TransferSource
     to_source: TransferSource
+    kind: TransferKind
+    payload: str
+    source_playlist_id: str | None = None
     status: TransferStatus = TransferStatus.queued
 
 
@@ -37,6 +69,38 @@ class TransferUpdate(BaseModel):
     status: TransferStatus | None = None
     result: str | None = None
     error: str | None = None
+    destination_playlist_id: str | None = None
+    source_snapshot_id: str | None = None
+    attempts: int | None = None
+    processed: int | None = None
+    matched: int | None = None
+    failed: int | None = None
+
+
+class TransferProgressUpdate(BaseModel):
+    """Counters are added to current ones, except total and checkpoint_offset, which are replaced"""
+    processed: int = 0
+    total: int | None = None
+    matched: int = 0
+    failed: int = 0
+    checkpoint_offset: int | None = None
+
+
+class TransferItemStatus(str, Enum):
+    matched = 'matched'
+    not_found = 'not_found'
+    failed = 'failed'
+
+
+class TransferItemCreate(BaseModel):
+    transfer_id: UUID
+    position: int
+    source_id: str
+    name: str
+    artist_name: str
+    destination_id: str | None = None
+    status: TransferItemStatus
+    latency_ms: int | None = None
 
 
 class SourceToken(BaseModel):
@@ -55,3 +119,15 @@ class SourceTokenCreate(BaseModel):
 
 class SourceTokenUpdate(BaseModel):
     token_data: str | None = None
+
+
+class TrackMatch(BaseModel):
+    destination: TransferSource
+    query_key: str
+    destination_id: str | None = None
+    """None means that track was not found in destination"""
+
+    @staticmethod
+    def make_query_key(name: str, artist: str) -> str:
+        """Normalized the same way as search candidates are matched, so equal keys mean the same match"""
+        return normalize_title(name) + "|" + normalize_artist(artist)
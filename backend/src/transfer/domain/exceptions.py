@@ -0,0 +1,2 @@
+class TransferOwnershipLostError(Exception):
+    """Transfer was returned to queue and claimed by another worker, current worker must stop it"""
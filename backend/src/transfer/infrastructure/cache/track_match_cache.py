@@ -0,0 +1,51 @@
+from loguru import logger
+
+from src.core.cache import TTLCache
+from src.core.metrics import metrics
+from src.transfer.application.interfaces.track_match_cache import ITrackMatchCache
+from src.transfer.domain.entities import TrackMatch
+
+
+class TieredTrackMatchCache(ITrackMatchCache):
+    """In-process LRU tier in front of persistent cache"""
+
+    def __init__(self, persistent: ITrackMatchCache, maxsize: int, ttl: int, negative_ttl: int) -> None:
+        self.persistent = persistent
+        self.negative_ttl = negative_ttl
+        self._local: TTLCache[tuple[str, str], TrackMatch] = TTLCache(maxsize, ttl)
+
+    def _set_local(self, match: TrackMatch) -> None:
+        ttl = None if match.destination_id is not None else self.negative_ttl
+        self._local.set((match.destination.value, match.query_key), match, ttl=ttl)
+
+    async def get_many(self, destination: str, query_keys: list[str]) -> dict[str, TrackMatch]:
+        result = {}
+        for key in query_keys:
+            if (match := self._local.get((destination, key))) is not None:
+                result[key] = match
+        metrics.inc("track_match_cache_hits_total", len(result), tier="memory", destination=destination)
+
+        missed_keys = [key for key in query_keys if key not in result]
+        if not missed_keys:
+            return result
+        try:
+            persisted = await self.persistent.get_many(destination, missed_keys)
+        except Exception as e:
+            logger.exception(e)
+            persisted = {}
+        for match in persisted.values():
+            self._set_local(match)
+        result |= persisted
+
+        metrics.inc("track_match_cache_hits_total", len(persisted), tier="persistent", destination=destination)
+        metrics.inc("track_match_cache_misses_total", len(missed_keys) - len(persisted), destination=destination)
+        return result
+
+    async def set_many(self, matches: list[TrackMatch]) -> None:
+        for match in matches:
+            self._set_local(match)
+        try:
+            await self.persistent.set_many(matches)
+        except Exception as e:
+            # Cache is an optimization, transfer must not fail because of it
+            logger.exception(e)
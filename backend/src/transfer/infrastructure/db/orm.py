@@ -1,10 +1,18 @@
-from sqlalchemy.orm import Mapped
+import datetime as dt
+from uuid import UUID
+
+from sqlalchemy import Index, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
 
 from src.db.base import Base, BaseMixin
 
 
 class TransferDB(BaseMixin, Base):
     __tablename__ = "transfers"
+    __table_args__ = (
+        Index("transfers_status_created_at_idx", "status", "created_at"),
+        Index("transfers_user_id_app_bundle_created_at_idx", "user_id", "app_bundle", "created_at"),
+    )
 
     from_source: Mapped[str]
     to_source: Mapped[str]
@@ -13,6 +21,33 @@ class TransferDB(BaseMixin, Base):
     user_id: Mapped[str]
     app_bundle: Mapped[str]
     error: Mapped[str | None]
+    kind: Mapped[str | None]
+    payload: Mapped[str | None]
+    worker_id: Mapped[str | None]
+    heartbeat_at: Mapped[dt.datetime | None]
+    attempts: Mapped[int] = mapped_column(server_default="0", default=0)
+    processed: Mapped[int] = mapped_column(server_default="0", default=0)
+    total: Mapped[int | None]
+    matched: Mapped[int] = mapped_column(server_default="0", default=0)
+    failed: Mapped[int] = mapped_column(server_default="0", default=0)
+    destination_playlist_id: Mapped[str | None] = mapped_column(index=True)
+    checkpoint_offset: Mapped[int] = mapped_column(server_default="0", default=0)
+    source_playlist_id: Mapped[str | None]
+    source_snapshot_id: Mapped[str | None]
+
+
+class TransferItemDB(BaseMixin, Base):
+    __tablename__ = "transfer_items"
+    __table_args__ = (Index("transfer_items_transfer_id_position_idx", "transfer_id", "position"),)
+
+    transfer_id: Mapped[UUID]
+    position: Mapped[int]
+    source_id: Mapped[str]
+    name: Mapped[str]
+    artist_name: Mapped[str]
+    destination_id: Mapped[str | None]
+    status: Mapped[str]
+    latency_ms: Mapped[int | None]
 
 
 class SourceTokenDB(BaseMixin, Base):
@@ -22,3 +57,13 @@ class SourceTokenDB(BaseMixin, Base):
     app_bundle: Mapped[str]
     source: Mapped[str]
     token_data: Mapped[str]
+
+
+class TrackMatchDB(BaseMixin, Base):
+    __tablename__ = "track_matches"
+    __table_args__ = (UniqueConstraint("destination", "query_key"),)
+
+    destination: Mapped[str]
+    query_key: Mapped[str]
+    destination_id: Mapped[str | None]
+    expires_at: Mapped[dt.datetime]
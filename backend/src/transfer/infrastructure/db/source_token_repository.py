@@ -1,4 +1,4 @@
-from sqlalchemy import select, update
+from sqlalchemy import func, select, update
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -24,7 +24,8 @@ class PGSourceTokenRepository(ISourceTokenRepository):
             raise DBModelConflictException(detail)
 
     async def get_by_user(self, user_id: str, app_bundle: str, source: str) -> SourceToken:
-        query = select(SourceTokenDB).filter_by(user_id=user_id, app_bundle=app_bundle, source=source)
+        query = select(SourceTokenDB).filter_by(user_id=user_id, app_bundle=app_bundle, source=source) \
+            .execution_options(populate_existing=True)
         model = await self.session.scalar(query)
         if model is None:
             raise DBModelNotFoundException()
@@ -54,6 +55,10 @@ class PGSourceTokenRepository(ISourceTokenRepository):
         await self._flush()
         return await self.get_by_user(user_id, app_bundle, source)
 
+    async def lock_by_user(self, user_id: str, app_bundle: str, source: str) -> None:
+        key = f"source_token:{user_id}:{app_bundle}:{source}"
+        await self.session.execute(select(func.pg_advisory_xact_lock(func.hashtext(key))))
+
     @staticmethod
     def _to_domain(model: SourceTokenDB) -> SourceToken:
         return SourceToken(
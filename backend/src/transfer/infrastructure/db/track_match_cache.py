@@ -0,0 +1,63 @@
+import datetime as dt
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+
+from src.db.engine import async_session_maker
+from src.transfer.application.interfaces.track_match_cache import ITrackMatchCache
+from src.transfer.domain.entities import TrackMatch, TransferSource
+from src.transfer.infrastructure.db.orm import TrackMatchDB
+
+
+class PGTrackMatchCache(ITrackMatchCache):
+    """Persistent matches, shared between transfers and workers. Uses own short sessions"""
+
+    def __init__(self, ttl: int, negative_ttl: int, session_factory=async_session_maker) -> None:
+        self.ttl = dt.timedelta(seconds=ttl)
+        self.negative_ttl = dt.timedelta(seconds=negative_ttl)
+        self.session_factory = session_factory
+
+    async def get_many(self, destination: str, query_keys: list[str]) -> dict[str, TrackMatch]:
+        if not query_keys:
+            return {}
+        query = select(TrackMatchDB).where(
+            TrackMatchDB.destination == destination,
+            TrackMatchDB.query_key.in_(query_keys),
+            TrackMatchDB.expires_at > dt.datetime.now(),
+        )
+        async with self.session_factory() as session:
+            models = await session.scalars(query)
+            return {model.query_key: self._to_domain(model) for model in models}
+
+    async def set_many(self, matches: list[TrackMatch]) -> None:
+        if not matches:
+            return
+        now = dt.datetime.now()
+        query = insert(TrackMatchDB).values([
+            {
+                "destination": match.destination.value,
+                "query_key": match.query_key,
+                "destination_id": match.destination_id,
+                "expires_at": now + (self.ttl if match.destination_id is not None else self.negative_ttl),
+            }
+            for match in matches
+        ])
+        query = query.on_conflict_do_update(
+            index_elements=[TrackMatchDB.destination, TrackMatchDB.query_key],
+            set_={
+                "destination_id": query.excluded.destination_id,
+                "expires_at": query.excluded.expires_at,
+                "updated_at": func.now(),
+            },
+        )
+        async with self.session_factory() as session:
+            await session.execute(query)
+            await session.commit()
+
+    @staticmethod
+    def _to_domain(model: TrackMatchDB) -> TrackMatch:
+        return TrackMatch(
+            destination=TransferSource(model.destination),
+            query_key=model.query_key,
+            destination_id=model.destination_id,
+        )
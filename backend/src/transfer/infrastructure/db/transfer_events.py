@@ -0,0 +1,110 @@
+import asyncio
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+from uuid import UUID
+
+import asyncpg
+from loguru import logger
+
+from src.transfer.application.interfaces.transfer_events import ITransferEvents, ITransferSubscription
+
+
+class TransferSubscription(ITransferSubscription):
+    def __init__(self) -> None:
+        self._changed = asyncio.Event()
+
+    def notify(self) -> None:
+        self._changed.set()
+
+    async def wait(self, timeout: float) -> bool:
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+        except TimeoutError:
+            return False
+        # Changes happened during wait are merged into one
+        self._changed.clear()
+        return True
+
+
+class PGTransferEvents(ITransferEvents):
+    """
+    In-process subscriptions to transfer changes. Changes are received by LISTEN on channel,
+    which is notified by transfers table trigger in any process
+    """
+    CHANNEL = "transfer_events"
+
+    def __init__(self, dsn: str, reconnect_delay: float = 5.0) -> None:
+        self.dsn = dsn
+        self.reconnect_delay = reconnect_delay
+        self._subscriptions: dict[UUID, set[TransferSubscription]] = defaultdict(set)
+        self._connection: asyncpg.Connection | None = None
+        self._reconnect_task: asyncio.Task | None = None
+        self._stopped = False
+
+    async def start(self) -> None:
+        self._stopped = False
+        try:
+            await self._connect()
+        except (OSError, asyncpg.PostgresError) as e:
+            logger.warning(f"Failed to listen transfer events: {e}")
+            self._schedule_reconnect()
+
+    async def stop(self) -> None:
+        self._stopped = True
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+        if self._connection is not None:
+            await self._connection.close()
+            self._connection = None
+
+    async def _connect(self) -> None:
+        self._connection = await asyncpg.connect(self.dsn)
+        self._connection.add_termination_listener(self._on_terminate)
+        await self._connection.add_listener(self.CHANNEL, self._on_notify)
+        # Changes may be missed while connection was lost
+        self._notify_all()
+
+    def _schedule_reconnect(self) -> None:
+        if self._stopped or (self._reconnect_task is not None and not self._reconnect_task.done()):
+            return
+        self._reconnect_task = asyncio.create_task(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        while not self._stopped:
+            await asyncio.sleep(self.reconnect_delay)
+            try:
+                await self._connect()
+                return
+            except (OSError, asyncpg.PostgresError) as e:
+                logger.warning(f"Failed to reconnect to transfer events: {e}")
+
+    def _on_terminate(self, _connection: asyncpg.Connection) -> None:
+        self._connection = None
+        if not self._stopped:
+            logger.warning("Transfer events connection lost")
+            self._schedule_reconnect()
+
+    def _on_notify(self, _connection: asyncpg.Connection, _pid: int, _channel: str, payload: str) -> None:
+        try:
+            transfer_id = UUID(payload)
+        except ValueError:
+            return
+        for subscription in self._subscriptions.get(transfer_id, ()):
+            subscription.notify()
+
+    def _notify_all(self) -> None:
+        for subscriptions in self._subscriptions.values():
+            for subscription in subscriptions:
+                subscription.notify()
+
+    @asynccontextmanager
+    async def subscribe(self, transfer_id: UUID) -> AsyncIterator[TransferSubscription]:
+        subscription = TransferSubscription()
+        self._subscriptions[transfer_id].add(subscription)
+        try:
+            yield subscription
+        finally:
+            self._subscriptions[transfer_id].discard(subscription)
+            if not self._subscriptions[transfer_id]:
+                del self._subscriptions[transfer_id]
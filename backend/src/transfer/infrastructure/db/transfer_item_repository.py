@@ -0,0 +1,43 @@
+from uuid import UUID
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.transfer.application.interfaces.transfer_item_repository import ITransferItemRepository
+from src.transfer.domain.entities import TransferItemCreate, TransferItemStatus
+from src.transfer.infrastructure.db.orm import TransferDB, TransferItemDB
+
+
+class PGTransferItemRepository(ITransferItemRepository):
+    def __init__(self, session: AsyncSession) -> None:
+        super().__init__()
+        self.session = session
+
+    async def create_many(self, items: list[TransferItemCreate]) -> None:
+        if not items:
+            return
+        # List of parameters is sent as one executemany, without loading models to session
+        await self.session.execute(insert(TransferItemDB), [item.model_dump(mode="json") for item in items])
+
+    async def delete_from_position(self, transfer_id: UUID, position: int) -> None:
+        query = delete(TransferItemDB).where(TransferItemDB.transfer_id == transfer_id,
+                                             TransferItemDB.position >= position)
+        await self.session.execute(query)
+
+    async def get_handled_source_ids(self, to_source: str, destination_playlist_id: str) -> set[str]:
+        query = select(TransferItemDB.source_id).distinct() \
+            .join(TransferDB, TransferDB.id == TransferItemDB.transfer_id) \
+            .where(
+                TransferDB.to_source == to_source,
+                TransferDB.destination_playlist_id == destination_playlist_id,
+                TransferItemDB.status.in_([TransferItemStatus.matched.value, TransferItemStatus.not_found.value]),
+                # Items after checkpoint were searched, but not added, if transfer failed or was interrupted
+                TransferItemDB.position < TransferDB.checkpoint_offset,
+            )
+        return set(await self.session.scalars(query))
+
+    async def count_by_status(self, transfer_id: UUID) -> dict[TransferItemStatus, int]:
+        query = select(TransferItemDB.status, func.count()).filter_by(transfer_id=transfer_id) \
+            .group_by(TransferItemDB.status)
+        result = await self.session.execute(query)
+        return {TransferItemStatus(status): count for status, count in result.all()}
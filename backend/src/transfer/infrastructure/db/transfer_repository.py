@@ -1,12 +1,15 @@
+import datetime as dt
 from uuid import UUID
 
-from sqlalchemy import update
+from sqlalchemy import func, select, tuple_, update
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
 from src.db.exceptions import DBModelConflictException, DBModelNotFoundException
 from src.transfer.application.interfaces.transfer_repository import ITransferRepository
-from src.transfer.domain.entities import Transfer, TransferCreate, TransferStatus, TransferUpdate
+from src.transfer.domain.entities import Transfer, TransferCreate, TransferKind, TransferProgressUpdate, \
+    TransferSource, TransferStatus, TransferUpdate
 from src.transfer.infrastructure.db.orm import TransferDB
 
 
@@ -21,6 +24,34 @@ class PGTransferRepository(ITransferRepository):
             raise DBModelNotFoundException()
         return self._to_domain(model)
 
+    async def get_many(self, pks: list[UUID]) -> list[Transfer]:
+        models = await self.session.scalars(select(TransferDB).where(TransferDB.id.in_(pks)))
+        return [self._to_domain(model) for model in models]
+
+    async def list_by_user(
+            self, user_id: str, app_bundle: str, limit: int, after: tuple[dt.datetime, UUID] | None = None
+    ) -> list[Transfer]:
+        query = select(TransferDB).filter_by(user_id=user_id, app_bundle=app_bundle) \
+            .order_by(TransferDB.created_at.desc(), TransferDB.id.desc()).limit(limit)
+        if after is not None:
+            query = query.where(tuple_(TransferDB.created_at, TransferDB.id) < tuple_(*after))
+        models = await self.session.scalars(query)
+        return [self._to_domain(model) for model in models]
+
+    async def get_last_finished_by_source_playlist(
+            self, user_id: str, app_bundle: str, from_source: str, to_source: str, source_playlist_id: str
+    ) -> Transfer | None:
+        query = select(TransferDB).filter_by(
+            user_id=user_id,
+            app_bundle=app_bundle,
+            from_source=from_source,
+            to_source=to_source,
+            source_playlist_id=source_playlist_id,
+            status=TransferStatus.finished.value,
+        ).where(TransferDB.destination_playlist_id.is_not(None)).order_by(TransferDB.created_at.desc()).limit(1)
+        model = await self.session.scalar(query)
+        return self._to_domain(model) if model is not None else None
+
     async def create(self, transfer_data: TransferCreate) -> Transfer:
         model = TransferDB(**transfer_data.model_dump(mode="json"))
         self.session.add(model)
@@ -49,6 +80,89 @@ class PGTransferRepository(ITransferRepository):
             raise DBModelConflictException(detail)
         return await self.get_by_pk(pk)
 
+    async def update_progress(self, pk: UUID, progress: TransferProgressUpdate, worker_id: str | None = None) -> bool:
+        values = {
+            "processed": TransferDB.processed + progress.processed,
+            "matched": TransferDB.matched + progress.matched,
+            "failed": TransferDB.failed + progress.failed,
+        }
+        if progress.total is not None:
+            values["total"] = progress.total
+        if progress.checkpoint_offset is not None:
+            values["checkpoint_offset"] = progress.checkpoint_offset
+        query = update(TransferDB).filter_by(id=pk).values(**values)
+        if worker_id is not None:
+            query = query.filter_by(worker_id=worker_id)
+        result = await self.session.execute(query)
+        return result.rowcount > 0
+
+    async def claim_next(
+            self, worker_id: str, kinds: list[TransferKind], destination_limits: dict[str, int]
+    ) -> Transfer | None:
+        # Claims of all workers are serialized to keep destination limits exact
+        await self.session.execute(select(func.pg_advisory_xact_lock(func.hashtext("transfers_claim"))))
+
+        started = await self.session.execute(
+            select(TransferDB.to_source, func.count()).filter_by(status=TransferStatus.started.value)
+            .group_by(TransferDB.to_source)
+        )
+        saturated = [
+            source for source, count in started.all()
+            if source in destination_limits and count >= destination_limits[source]
+        ]
+
+        user_transfers = aliased(TransferDB)
+        user_started_count = select(func.count()).where(
+            user_transfers.status == TransferStatus.started.value,
+            user_transfers.user_id == TransferDB.user_id,
+            user_transfers.app_bundle == TransferDB.app_bundle,
+        ).scalar_subquery()
+        query = select(TransferDB).where(
+            TransferDB.status == TransferStatus.queued.value,
+            TransferDB.kind.in_([kind.value for kind in kinds]),
+            TransferDB.to_source.not_in(saturated),
+        ).order_by(user_started_count, TransferDB.created_at).limit(1).with_for_update(of=TransferDB, skip_locked=True)
+        model = await self.session.scalar(query)
+        if model is None:
+            return None
+        model.status = TransferStatus.started.value
+        model.worker_id = worker_id
+        model.heartbeat_at = func.now()
+        model.attempts += 1
+        await self.session.flush()
+        await self.session.refresh(model)
+        return self._to_domain(model)
+
+    async def count_queued(self) -> dict[TransferKind | None, int]:
+        result = await self.session.execute(
+            select(TransferDB.kind, func.count()).filter_by(status=TransferStatus.queued.value)
+            .group_by(TransferDB.kind)
+        )
+        return {TransferKind(kind) if kind else None: count for kind, count in result.all()}
+
+    async def heartbeat(self, pk: UUID, worker_id: str) -> bool:
+        query = update(TransferDB).filter_by(id=pk, worker_id=worker_id, status=TransferStatus.started.value) \
+            .values(heartbeat_at=func.now())
+        result = await self.session.execute(query)
+        return result.rowcount > 0
+
+    async def requeue_stale(self, stale_timeout: float, max_attempts: int) -> int:
+        stale = (
+            TransferDB.status == TransferStatus.started.value,
+            TransferDB.worker_id.is_not(None),
+            # Database clock is used, worker clocks may differ
+            TransferDB.heartbeat_at < func.now() - dt.timedelta(seconds=stale_timeout),
+        )
+        failed = await self.session.execute(
+            update(TransferDB).where(*stale, TransferDB.attempts >= max_attempts).values(
+                status=TransferStatus.failed.value, worker_id=None, error="Transfer worker stopped responding")
+        )
+        requeued = await self.session.execute(
+            update(TransferDB).where(*stale).values(status=TransferStatus.queued.value, worker_id=None)
+        )
+        await self.session.flush()
+        return failed.rowcount + requeued.rowcount
+
     @staticmethod
     def _to_domain(model: TransferDB) -> Transfer:
         return Transfer(
@@ -57,5 +171,21 @@ class PGTransferRepository(ITransferRepository):
             result=model.result,
             error=model.error,
             user_id=model.user_id,
-            app_bundle=model.app_bundle
+            app_bundle=model.app_bundle,
+            from_source=TransferSource(model.from_source),
+            to_source=TransferSource(model.to_source),
+            kind=TransferKind(model.kind) if model.kind else None,
+            payload=model.payload,
+            attempts=model.attempts,
+            created_at=model.created_at,
+            worker_id=model.worker_id,
+            heartbeat_at=model.heartbeat_at,
+            processed=model.processed,
+            total=model.total,
+            matched=model.matched,
+            failed=model.failed,
+            destination_playlist_id=model.destination_playlist_id,
+            checkpoint_offset=model.checkpoint_offset,
+            source_playlist_id=model.source_playlist_id,
+            source_snapshot_id=model.source_snapshot_id,
         )
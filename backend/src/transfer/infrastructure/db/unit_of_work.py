@@ -3,6 +3,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from src.db.engine import async_session_maker
 from src.transfer.application.interfaces.unit_of_work import ITransferUnitOfWork
 from src.transfer.infrastructure.db.source_token_repository import PGSourceTokenRepository
+from src.transfer.infrastructure.db.transfer_item_repository import PGTransferItemRepository
 from src.transfer.infrastructure.db.transfer_repository import PGTransferRepository
 
 
@@ -14,12 +15,16 @@ class PGTransferUnitOfWork(ITransferUnitOfWork):
         self.session: AsyncSession = self.session_factory()
         self.transfers = PGTransferRepository(self.session)
         self.source_tokens = PGSourceTokenRepository(self.session)
+        self.transfer_items = PGTransferItemRepository(self.session)
         return await super().__aenter__()
 
     async def __aexit__(self, *args):
         await super().__aexit__(*args)
         await self.session.close()
 
+    def fork(self) -> "PGTransferUnitOfWork":
+        return PGTransferUnitOfWork(self.session_factory)
+
     async def _commit(self):
         await self.session.commit()
 
@@ -0,0 +1,55 @@
+import asyncio
+import os
+import signal
+import socket
+
+from src.core.config import settings
+from src.db.metrics_store import metrics_store
+from src.integration.infrastructure.external_api.youtube_music.quota import youtube_quota
+from src.integration.infrastructure.http.session import close_http_session, open_http_session
+from src.transfer.api.dependencies import get_track_match_cache, get_transfer_client, get_transfer_uow
+from src.transfer.application.transfer_worker import TransferLane, TransferWorker
+from src.transfer.domain.entities import TransferKind
+
+
+async def main():
+    await open_http_session()
+    worker = TransferWorker(
+        f"{socket.gethostname()}:{os.getpid()}",
+        uow_factory=get_transfer_uow,
+        client_factory=get_transfer_client,
+        lanes=[
+            TransferLane(
+                name="small",
+                kinds=[TransferKind.album, TransferKind.playlist],
+                concurrency=settings.TRANSFER_SMALL_LANE_CONCURRENCY,
+            ),
+            TransferLane(
+                name="large",
+                kinds=[TransferKind.favorite],
+                concurrency=settings.TRANSFER_LARGE_LANE_CONCURRENCY,
+            ),
+        ],
+        match_cache=get_track_match_cache(),
+        destination_limits=settings.TRANSFER_DESTINATION_CONCURRENCY,
+        poll_interval=settings.TRANSFER_WORKER_POLL_INTERVAL,
+        heartbeat_interval=settings.TRANSFER_HEARTBEAT_INTERVAL,
+        stale_timeout=settings.TRANSFER_STALE_TIMEOUT,
+        max_attempts=settings.TRANSFER_MAX_ATTEMPTS,
+    )
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+    # Worker has no http server, its metrics are read by api from database
+    metrics_export = asyncio.create_task(metrics_store.run(settings.METRICS_EXPORT_INTERVAL))
+    try:
+        await worker.run()
+    finally:
+        metrics_export.cancel()
+        await metrics_store.save()
+        await youtube_quota.release()
+        await close_http_session()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
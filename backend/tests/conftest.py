@@ -0,0 +1,8 @@
+import os
+
+# Settings are required on import of src, tests don't connect to database
+os.environ.setdefault("ENVIRONMENT", "test")
+os.environ.setdefault("DOMAIN", "localhost")
+os.environ.setdefault("DB_TYPE", "ASYNC_POSTGRESQL")
+os.environ.setdefault("DB_NAME", "test")
+os.environ.setdefault("DB_HOST", "localhost")
@@ -0,0 +1,58 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from src.core.config import settings
+from src.integration.domain.entities import MusicSource, Track
+from src.integration.domain.matching import TrackFeatures, best_match, normalize_title
+
+CORPUS = json.loads((Path(__file__).parent / "data" / "matching_corpus.json").read_text())
+
+
+def match_case(case: dict) -> int | None:
+    query = case["query"]
+    candidates = [
+        Track(
+            source_id=str(index),
+            source=MusicSource.YOUTUBE,
+            name=candidate["name"],
+            artist_name=candidate["artist"],
+            duration_ms=candidate.get("duration_ms"),
+        )
+        for index, candidate in enumerate(case["candidates"])
+    ]
+    features = TrackFeatures.from_values(query["name"], query["artist"], query.get("duration_ms"))
+    match = best_match(features, candidates, settings.TRACK_MATCH_MIN_SCORE)
+    return int(match.source_id) if match is not None else None
+
+
+def test_corpus_precision_and_recall():
+    matched = [(case, match_case(case)) for case in CORPUS]
+    accepted = [(case, result) for case, result in matched if result is not None]
+    correct = [(case, result) for case, result in accepted if result == case["expected"]]
+    expected_count = sum(1 for case in CORPUS if case["expected"] is not None)
+
+    precision = len(correct) / len(accepted)
+    recall = len(correct) / expected_count
+    assert precision >= 0.95
+    assert recall >= 0.9
+
+
+@pytest.mark.parametrize(
+    "title, expected",
+    [
+        ("Oasis - Live Forever (Official HD Remastered Video)", "oasis live forever"),
+        ("Hey Jude - Remastered 2015", "hey jude"),
+        ("Song (feat. Artist) - 2011 Remaster", "song"),
+        ("Get Lucky feat. Pharrell Williams", "get lucky"),
+        ("Café del Mar", "cafe del mar"),
+    ],
+)
+def test_normalize_title(title: str, expected: str):
+    assert normalize_title(title) == expected
+
+
+def test_title_of_other_artist_is_not_matched():
+    case = {"query": {"name": "Hello", "artist": "Adele"}, "candidates": [{"name": "Hello", "artist": "Lionel Richie"}]}
+    assert match_case(case) is None
@@ -0,0 +1,68 @@
+import uuid
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from src.transfer.domain.entities import TransferItemStatus, TransferStatus
+from src.transfer.infrastructure.db.orm import TransferDB, TransferItemDB
+from src.transfer.infrastructure.db.transfer_item_repository import PGTransferItemRepository
+
+
+class SyncSessionAdapter:
+    """Runs read queries of repository on sync session, there is no database server in tests"""
+
+    def __init__(self, session: Session) -> None:
+        self.session = session
+
+    async def scalars(self, query):
+        return self.session.scalars(query)
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    TransferDB.metadata.create_all(engine, tables=[TransferDB.__table__, TransferItemDB.__table__])
+    with Session(engine) as session:
+        yield session
+
+
+def add_transfer(session: Session, status: TransferStatus, checkpoint_offset: int, statuses: list[TransferItemStatus],
+                 destination_playlist_id: str = "playlist") -> None:
+    transfer_id = uuid.uuid4()
+    session.add(TransferDB(
+        id=transfer_id, from_source="spotify", to_source="youtube", status=status.value, user_id="user",
+        app_bundle="app", destination_playlist_id=destination_playlist_id, checkpoint_offset=checkpoint_offset,
+    ))
+    session.add_all(
+        TransferItemDB(
+            id=uuid.uuid4(), transfer_id=transfer_id, position=position,
+            source_id=f"{destination_playlist_id}-{position}", name="Song", artist_name="Artist",
+            status=item_status.value,
+        )
+        for position, item_status in enumerate(statuses)
+    )
+    session.flush()
+
+
+async def test_items_after_checkpoint_of_failed_transfer_are_synced_again(session: Session):
+    # Failed transfer added first two tracks, the other two were searched, but not added
+    add_transfer(session, TransferStatus.failed, 2, [
+        TransferItemStatus.matched, TransferItemStatus.not_found, TransferItemStatus.matched,
+        TransferItemStatus.matched,
+    ])
+    add_transfer(session, TransferStatus.finished, 1, [TransferItemStatus.matched], destination_playlist_id="other")
+
+    handled = await PGTransferItemRepository(SyncSessionAdapter(session)).get_handled_source_ids("youtube", "playlist")
+
+    assert handled == {"playlist-0", "playlist-1"}
+
+
+async def test_failed_searches_are_not_handled(session: Session):
+    add_transfer(session, TransferStatus.finished, 3, [
+        TransferItemStatus.matched, TransferItemStatus.failed, TransferItemStatus.not_found,
+    ])
+
+    handled = await PGTransferItemRepository(SyncSessionAdapter(session)).get_handled_source_ids("youtube", "playlist")
+
+    assert handled == {"playlist-0", "playlist-2"}
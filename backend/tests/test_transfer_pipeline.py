@@ -0,0 +1,66 @@
+from typing import AsyncIterator
+
+from src.integration.domain.entities import MatchResult, MatchStatus, MusicSource, PlaylistTracksAddResult, Track, \
+    TracksPage
+from src.transfer.application.integration_utils import exclude_tracks, search_and_add_tracks
+
+
+class FakeDestinationClient:
+    SOURCE = "youtube"
+    ADD_TRACKS_CHUNK_SIZE = 2
+
+    def __init__(self) -> None:
+        self.added: list[str] = []
+
+    async def search_tracks(self, _token: str, tracks: list[Track]) -> AsyncIterator[MatchResult]:
+        for index, track in enumerate(tracks):
+            yield MatchResult(index=index, status=MatchStatus.matched, destination_id=f"found-{track.source_id}")
+
+    async def add_tracks_to_playlist(self, _token: str, _playlist_id: str, *track_ids: str):
+        self.added.extend(track_ids)
+        return [PlaylistTracksAddResult(offset=0, tracks_count=len(track_ids))]
+
+
+def make_track(source_id: str) -> Track:
+    return Track(source_id=source_id, source=MusicSource.SPOTIFY, name=f"Song {source_id}", artist_name="Artist")
+
+
+async def iter_pages(*pages: list[str], total: int | None) -> AsyncIterator[TracksPage]:
+    for page in pages:
+        yield TracksPage(tracks=[make_track(source_id) for source_id in page], total=total)
+
+
+async def test_progress_total_is_source_size_from_first_page():
+    client = FakeDestinationClient()
+    reported: list[tuple[int, int | None]] = []
+
+    async def on_searched(tracks: list[Track], _results: list[MatchResult], total: int | None) -> None:
+        reported.append((len(tracks), total))
+
+    await search_and_add_tracks(
+        client, "token", "playlist", iter_pages(["1", "2", "3"], ["4", "5", "6"], total=6), on_searched=on_searched
+    )
+
+    assert reported == [(2, 6), (2, 6), (2, 6)]
+    assert len(client.added) == 6
+
+
+async def test_progress_total_is_unknown_when_source_does_not_report_it():
+    reported: list[int | None] = []
+
+    async def on_searched(_tracks: list[Track], _results: list[MatchResult], total: int | None) -> None:
+        reported.append(total)
+
+    await search_and_add_tracks(
+        FakeDestinationClient(), "token", "playlist", iter_pages(["1", "2", "3"], total=None), on_searched=on_searched
+    )
+
+    assert reported == [None, None]
+
+
+async def test_excluded_tracks_are_subtracted_from_total():
+    pages = exclude_tracks(iter_pages(["1", "2"], ["3", "4"], ["5"], total=5), {"2", "3", "4"})
+
+    totals = [(len(page.tracks), page.total) async for page in pages]
+
+    assert totals == [(1, 4), (1, 2)]
@@ -0,0 +1,136 @@
+import asyncio
+
+from pydantic import BaseModel
+
+from src.transfer.application.integration_utils import get_transfer_token
+from src.transfer.application.interfaces.unit_of_work import ITransferUnitOfWork
+from src.transfer.domain.entities import SourceToken, SourceTokenUpdate, TransferSource
+
+
+class FakeToken(BaseModel):
+    access_token: str
+    expired: bool = False
+
+
+class FakeSourceTokenRepository:
+    def __init__(self, token: FakeToken) -> None:
+        self.token_data = token.model_dump_json()
+        self.loads = 0
+        self.updates = 0
+        self.locked = False
+
+    async def get_by_user(self, user_id: str, app_bundle: str, source: str) -> SourceToken:
+        self.loads += 1
+        await asyncio.sleep(0)
+        return SourceToken(source=TransferSource(source), user_id=user_id, app_bundle=app_bundle,
+                           token_data=self.token_data)
+
+    async def lock_by_user(self, *_key: str) -> None:
+        self.locked = True
+
+    async def update_by_user(self, _user_id: str, _app_bundle: str, _source: str, data: SourceTokenUpdate) -> None:
+        self.updates += 1
+        self.token_data = data.token_data
+
+
+class FakeUnitOfWork(ITransferUnitOfWork):
+    def __init__(self, source_tokens: FakeSourceTokenRepository) -> None:
+        self.source_tokens = source_tokens
+        self.forks = 0
+
+    def fork(self) -> "FakeUnitOfWork":
+        self.forks += 1
+        return FakeUnitOfWork(self.source_tokens)
+
+    async def _commit(self):
+        self.source_tokens.locked = False
+
+    async def _rollback(self):
+        self.source_tokens.locked = False
+
+
+class FakeTransferClient:
+    SOURCE = TransferSource.SPOTIFY.value
+
+    def __init__(self) -> None:
+        self.refreshes = 0
+        self.refresh_started = asyncio.Event()
+        self.refresh_allowed = asyncio.Event()
+        self.refresh_allowed.set()
+
+    def parse_token(self, token_raw: str) -> FakeToken:
+        return FakeToken.model_validate_json(token_raw)
+
+    async def validate_token(self, token: FakeToken) -> bool:
+        return not token.expired
+
+    async def refresh_token(self, token: FakeToken) -> FakeToken:
+        self.refreshes += 1
+        self.refresh_started.set()
+        await self.refresh_allowed.wait()
+        return FakeToken(access_token=f"{token.access_token}-refreshed")
+
+
+async def test_concurrent_callers_share_one_load_and_refresh():
+    source_tokens = FakeSourceTokenRepository(FakeToken(access_token="old", expired=True))
+    uows = [FakeUnitOfWork(source_tokens) for _ in range(100)]
+    client = FakeTransferClient()
+
+    tokens = await asyncio.gather(*(get_transfer_token(uow, client, "concurrent", "app") for uow in uows))
+
+    assert {token.access_token for token in tokens} == {"old-refreshed"}
+    assert client.refreshes == 1
+    assert source_tokens.updates == 1
+    # First read and re-read under lock
+    assert source_tokens.loads == 2
+    assert sum(uow.forks for uow in uows) == 1
+
+
+async def test_cancelled_caller_does_not_break_waiters():
+    source_tokens = FakeSourceTokenRepository(FakeToken(access_token="old", expired=True))
+    client = FakeTransferClient()
+    client.refresh_allowed.clear()
+
+    first = asyncio.create_task(get_transfer_token(FakeUnitOfWork(source_tokens), client, "cancelled", "app"))
+    await client.refresh_started.wait()
+    waiters = [
+        asyncio.create_task(get_transfer_token(FakeUnitOfWork(source_tokens), client, "cancelled", "app"))
+        for _ in range(10)
+    ]
+    await asyncio.sleep(0)
+    first.cancel()
+    client.refresh_allowed.set()
+
+    tokens = await asyncio.gather(*waiters)
+
+    assert first.cancelled()
+    assert {token.access_token for token in tokens} == {"old-refreshed"}
+    assert client.refreshes == 1
+
+
+async def test_lock_is_released_when_token_was_refreshed_by_other_worker():
+    source_tokens = FakeSourceTokenRepository(FakeToken(access_token="old", expired=True))
+    client = FakeTransferClient()
+    locked_on_exit = []
+
+    class RecordingUnitOfWork(FakeUnitOfWork):
+        def fork(self) -> "RecordingUnitOfWork":
+            return RecordingUnitOfWork(self.source_tokens)
+
+        async def __aexit__(self, *excinfo):
+            locked_on_exit.append(self.source_tokens.locked)
+            await super().__aexit__(*excinfo)
+
+    async def lock_by_user(*_key: str) -> None:
+        # Other worker refreshed the token while this one waited for lock
+        source_tokens.locked = True
+        source_tokens.token_data = FakeToken(access_token="new").model_dump_json()
+
+    source_tokens.lock_by_user = lock_by_user
+
+    token = await get_transfer_token(RecordingUnitOfWork(source_tokens), client, "refreshed-by-other", "app")
+
+    assert token.access_token == "new"
+    assert client.refreshes == 0
+    assert source_tokens.updates == 0
+    assert locked_on_exit == [False]
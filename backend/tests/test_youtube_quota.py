@@ -0,0 +1,57 @@
+import asyncio
+import datetime as dt
+
+import pytest
+
+from src.integration.domain.exceptions import ExternalApiQuotaExceededError
+from src.integration.infrastructure.external_api.youtube_music.quota import YoutubeQuota
+
+
+class InMemoryYoutubeQuota(YoutubeQuota):
+    """Shared row of quota day is kept in memory, reservation keeps the same check as database statement"""
+
+    def __init__(self, daily_limit: int, batch_size: int) -> None:
+        super().__init__(daily_limit, batch_size)
+        self.used = 0
+        self.reservations: list[int] = []
+
+    async def _reserve(self, _day: dt.date, units: int) -> int | None:
+        await asyncio.sleep(0)
+        if self.used + units > self.daily_limit:
+            return None
+        self.used += units
+        self.reservations.append(units)
+        return self.used
+
+    async def get_remaining(self) -> int:
+        return self.daily_limit - self.used + self._reserved
+
+
+async def test_concurrent_requests_share_one_reservation():
+    quota = InMemoryYoutubeQuota(daily_limit=10000, batch_size=500)
+
+    await asyncio.gather(*(quota.spend(quota.LIST_COST) for _ in range(100)))
+
+    assert quota.reservations == [500]
+    assert quota._reserved == 400
+
+
+async def test_request_larger_than_batch_is_reserved_whole():
+    quota = InMemoryYoutubeQuota(daily_limit=10000, batch_size=500)
+
+    await quota.spend(quota.INSERT_COST * 20)
+
+    assert quota.reservations == [1000]
+    assert quota._reserved == 0
+
+
+async def test_last_units_are_reserved_when_batch_does_not_fit():
+    quota = InMemoryYoutubeQuota(daily_limit=600, batch_size=500)
+
+    for _ in range(6):
+        await quota.spend(quota.SEARCH_COST)
+    with pytest.raises(ExternalApiQuotaExceededError):
+        await quota.spend(quota.LIST_COST)
+
+    assert quota.reservations == [500, 100]
+    assert quota.used == 600